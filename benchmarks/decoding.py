@@ -0,0 +1,67 @@
+"""
+Compare the float modes of the JSON decoder with decoding responses as facepy did before.
+
+The payloads are shaped like a page of insights (mostly floating-point values) and a page
+of a feed (strings and integers only).
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=. python benchmarks/decoding.py [items] [repeat]
+
+Install orjson or ujson to measure the fast decoders.
+"""
+import json
+import sys
+import timeit
+
+from decimal import Decimal
+
+from facepy import decoding
+from facepy.decoding import loads
+
+
+def insights(items):
+    return json.dumps({
+        'data': [{
+            'name': 'page_impressions',
+            'period': 'day',
+            'values': [
+                {'value': i * 1.37, 'end_time': '2020-01-%02dT08:00:00+0000' % (day + 1)}
+                for day in range(28)
+            ],
+            'id': '1/insights/page_impressions/day'
+        } for i in range(items)],
+        'paging': {'next': 'https://graph.facebook.com/v2.12/1/insights?after=abc'}
+    }).encode('utf-8')
+
+
+def feed(items):
+    return json.dumps({
+        'data': [{
+            'id': '1_%d' % i,
+            'message': 'Post number %d with some text: v2.12 and more' % i,
+            'created_time': '2020-01-01T08:00:00+0000',
+            'likes': {'summary': {'total_count': i}},
+            'from': {'id': '1', 'name': 'Thomas \'Herc\' Hauk'}
+        } for i in range(items)],
+        'paging': {'next': 'https://graph.facebook.com/v2.12/1/feed?after=abc'}
+    }).encode('utf-8')
+
+
+def main(items=1000, repeat=20):
+    decoder = 'orjson' if decoding.orjson else 'ujson' if decoding.ujson else 'json'
+    print('Fast decoder: %s' % decoder)
+
+    for name, payload in [('insights', insights(items)), ('feed', feed(items * 10))]:
+        print('%s (%d KB):' % (name, len(payload) // 1024))
+
+        baseline = timeit.timeit(lambda: json.loads(payload.decode('utf-8'), parse_float=Decimal), number=repeat)
+        print('  %-10s %.1f ms' % ('baseline', baseline / repeat * 1000))
+
+        for float_mode in decoding.FLOAT_MODES:
+            elapsed = timeit.timeit(lambda: loads(payload, float_mode), number=repeat)
+            print('  %-10s %.1f ms (%.1fx)' % (float_mode, elapsed / repeat * 1000, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,155 @@
+"""
+Compare the default HTTP/1.1 transport with the HTTP/2 transport.
+
+Both transports make the same number of concurrent requests to local stub servers that
+respond after a simulated network latency. The HTTP/1.1 server is a threaded
+``http.server``; the HTTP/2 server speaks cleartext HTTP/2 (h2c) with prior knowledge.
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=. python benchmarks/http2.py [requests] [threads] [latency]
+
+Requires httpx with HTTP/2 support (``pip install httpx[http2]``).
+"""
+import json
+import socket
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+import httpx
+
+from facepy import GraphAPI
+from facepy.transport import HTTP2Transport
+
+BODY = json.dumps({'id': '1', 'name': 'Thomas \'Herc\' Hauk'}).encode('utf-8')
+
+
+class HTTP1Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTP1Server(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        ThreadingHTTPServer.process_request(self, request, client_address)
+
+
+class HTTP2Server(object):
+    """
+    A minimal h2c server that responds to every request with ``BODY`` after ``latency`` seconds.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.connections = 0
+        self.socket = socket.socket()
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(128)
+        self.port = self.socket.getsockname()[1]
+
+    def serve_forever(self):
+        while True:
+            client, address = self.socket.accept()
+            self.connections += 1
+            thread = threading.Thread(target=self.handle, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def handle(self, client):
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        lock = threading.Lock()
+
+        def send():
+            data = connection.data_to_send()
+            if data:
+                client.sendall(data)
+
+        def respond(stream_id):
+            time.sleep(self.latency)
+            with lock:
+                connection.send_headers(stream_id, [
+                    (':status', '200'),
+                    ('content-type', 'application/json'),
+                    ('content-length', str(len(BODY))),
+                ])
+                connection.send_data(stream_id, BODY, end_stream=True)
+                send()
+
+        with lock:
+            send()
+
+        while True:
+            data = client.recv(65535)
+            if not data:
+                return
+
+            with lock:
+                events = connection.receive_data(data)
+                send()
+
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    thread = threading.Thread(target=respond, args=(event.stream_id,))
+                    thread.daemon = True
+                    thread.start()
+
+
+def run(graph, requests, threads):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        started_at = time.time()
+        list(executor.map(lambda i: graph.get('me'), range(requests)))
+        return time.time() - started_at
+
+
+def main(requests=1000, threads=64, latency=0.02):
+    HTTP1Handler.latency = latency
+    http1 = HTTP1Server(('127.0.0.1', 0), HTTP1Handler)
+    http2 = HTTP2Server(latency)
+
+    for server in (http1, http2):
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    graph = GraphAPI(
+        '<access token>', url='http://127.0.0.1:%s' % http1.server_address[1], pool_maxsize=threads
+    )
+    elapsed = run(graph, requests, threads)
+    print('HTTP/1.1: %d requests in %.2fs (%.0f/s) over %d connections' % (
+        requests, elapsed, requests / elapsed, http1.connections
+    ))
+
+    transport = HTTP2Transport(client=httpx.Client(http1=False, http2=True))
+    graph = GraphAPI('<access token>', url='http://127.0.0.1:%s' % http2.port, transport=transport)
+    elapsed = run(graph, requests, threads)
+    print('HTTP/2:   %d requests in %.2fs (%.0f/s) over %d connections' % (
+        requests, elapsed, requests / elapsed, http2.connections
+    ))
+
+
+if __name__ == '__main__':
+    main(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,70 @@
+"""
+Compare looking for the 'paging' object of large responses with field expansion the way
+facepy did before (a depth-first search of every nested object) with the bounded,
+breadth-first search and with a known paging path.
+
+The responses are shaped like an object with many expanded fields, each a tree of nested
+objects, with the paginated edge last or without one at all.
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=. python benchmarks/paging.py [fields] [number]
+"""
+import sys
+import timeit
+
+from facepy import GraphAPI
+from facepy.graph_api import find_paging
+
+
+def nested_get(needle, haystack):
+    """
+    Get the given key anywhere in a nested dictionary, as facepy looked for 'paging' before.
+    """
+    if needle in haystack:
+        return haystack[needle]
+    for key, value in haystack.items():
+        if isinstance(value, dict):
+            item = nested_get(needle, value)
+            if item is not None:
+                return item
+
+
+def tree(depth, width=3):
+    if depth == 0:
+        return {'id': '1', 'name': 'Thomas \'Herc\' Hauk'}
+
+    return dict(('field_%d' % i, tree(depth - 1, width)) for i in range(width))
+
+
+def expanded(fields, paginated):
+    result = dict(('field_%d' % i, tree(4)) for i in range(fields))
+
+    if paginated:
+        result['posts'] = {
+            'data': [{'id': '1_%d' % i} for i in range(25)],
+            'paging': {'next': 'https://graph.facebook.com/v2.12/1/posts?after=abc'}
+        }
+
+    return result
+
+
+def main(fields=100, number=200):
+    graph = GraphAPI()
+
+    for name, result in [('edge last', expanded(fields, True)), ('no paging', expanded(fields, False))]:
+        print('%s (%d fields):' % (name, fields))
+
+        scenarios = [
+            ('nested_get', lambda: nested_get('paging', result)),
+            ('find_paging', lambda: find_paging(result)),
+            ('paging_path', lambda: graph._get_next_url(result, ('posts', 'paging'))),
+        ]
+
+        for scenario, function in scenarios:
+            elapsed = min(timeit.repeat(function, number=number, repeat=5))
+            print('  %-12s %.1f us' % (scenario, elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
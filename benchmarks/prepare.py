@@ -0,0 +1,103 @@
+"""
+Measure the overhead of preparing a request: resolving its URL and encoding its parameters,
+including the access token and appsecret proof.
+
+Usage (from the root of the repository):
+
+    PYTHONPATH=. python benchmarks/prepare.py [number]
+"""
+import json
+import sys
+import timeit
+
+import six
+
+try:
+    import urllib.parse as urlparse
+except ImportError:
+    import urlparse
+
+from facepy import GraphAPI
+
+TOKEN = 'EAAB' + 'x' * 180
+APPSECRET = 'a' * 32
+OPTIONS = {'fields': ['id', 'name', 'picture'], 'limit': 100, 'filtering': [{'field': 'x', 'operator': 'IN', 'value': [1]}]}
+SMALL_OPTIONS = {'fields': ['id', 'name']}
+
+
+def uncached(graph):
+    """
+    Generate the appsecret proof for every request, as facepy did before proofs were cached.
+    """
+    graph._get_appsecret_proof = graph._generate_appsecret_proof
+    return graph
+
+
+def prepare(graph, options=OPTIONS):
+    graph._prepare_query('act_1/insights', dict(options))
+
+
+def legacy_prepare(graph, options=OPTIONS):
+    """
+    Prepare a request the way facepy did before parameters were encoded in a single pass.
+    """
+    data = dict(options)
+    data = dict((k.replace('_sqbro_', '['), v) for k, v in data.items())
+    data = dict((k.replace('_sqbrc_', ']'), v) for k, v in data.items())
+    data = dict((k.replace('__', ':'), v) for k, v in data.items())
+
+    for key in data:
+        if isinstance(data[key], (list, set, tuple)) and all([isinstance(item, six.string_types) for item in data[key]]):
+            data[key] = ','.join(data[key])
+
+    graph._get_url('/act_1/insights')
+
+    data['access_token'] = graph.oauth_token
+    data['appsecret_proof'] = graph._get_appsecret_proof()
+
+    for key in data:
+        if isinstance(data[key], (list, dict, set)):
+            data[key] = json.dumps(data[key])
+
+
+def legacy_get_url(graph, path):
+    """
+    Resolve a URL the way facepy did before the base URL and version were cached.
+    """
+    if urlparse.urlparse(path).netloc == '':
+        url = graph.url
+    else:
+        url = ''
+
+    if graph.version:
+        url = '%s/v%s%s' % (url, graph.version, path)
+    else:
+        url = '%s%s' % (url, path)
+
+    return url
+
+
+def main(number=20000):
+    def create():
+        return GraphAPI(TOKEN, appsecret=APPSECRET, version='2.12')
+
+    graph, uncached_graph = create(), uncached(create())
+
+    scenarios = [
+        ('one instance, uncached proof', lambda: prepare(uncached_graph)),
+        ('one instance, cached proof', lambda: prepare(graph)),
+        ('legacy parameter encoding', lambda: legacy_prepare(graph)),
+        ('single-pass parameter encoding', lambda: prepare(graph)),
+        ('legacy parameter encoding, small', lambda: legacy_prepare(graph, SMALL_OPTIONS)),
+        ('single-pass parameter encoding, small', lambda: prepare(graph, SMALL_OPTIONS)),
+        ('legacy URL resolution', lambda: legacy_get_url(graph, '/act_1/insights')),
+        ('cached URL prefix', lambda: graph._get_url('/act_1/insights')),
+    ]
+
+    for name, function in scenarios:
+        elapsed = min(timeit.repeat(function, number=number, repeat=5))
+        print('%-40s %.2f us' % (name, elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,3 +1,5 @@
+import sys
+
 from facepy.exceptions import (
     FacebookError,
     FacepyError,
@@ -22,3 +24,8 @@ __all__ = [
     'get_application_access_token',
     'get_extended_access_token',
 ]
+
+if sys.version_info >= (3, 6):
+    from facepy.async_graph_api import AsyncGraphAPI
+
+    __all__.append('AsyncGraphAPI')
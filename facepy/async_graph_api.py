@@ -0,0 +1,310 @@
+try:
+    import simplejson as json
+except ImportError:
+    import json  # flake8: noqa
+import asyncio
+import logging
+import time
+
+from collections import deque
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from facepy.exceptions import *
+from facepy.graph_api import BaseGraphAPI, _grouper
+
+log = logging.getLogger(__name__)
+
+
+class AsyncGraphAPI(BaseGraphAPI):
+    """
+    A variant of :class:`GraphAPI` for use with :mod:`asyncio`.
+
+    Requests are made with `aiohttp <https://docs.aiohttp.org/>`_, so many requests
+    may be in flight on the same event loop at once::
+
+        async with AsyncGraphAPI(access_token) as graph:
+            me = await graph.get('me')
+
+            async for page in graph.get('me/posts', page=True):
+                ...
+    """
+
+    def __init__(self, oauth_token=False, url='https://graph.facebook.com', verify_ssl_certificate=True, appsecret=False, timeout=None, version=None, session=None,
+                 retry_policy=None, float_mode='decimal'):
+        """
+        Initialize AsyncGraphAPI with an OAuth access token.
+
+        :param oauth_token: A string describing an OAuth access token.
+        :param version: A string with version ex. '2.2'.
+        :param session: An optional ``aiohttp.ClientSession`` to make requests with. If omitted,
+                        a session is created upon the first request and closed by :meth:`close`.
+        :param retry_policy: An optional :class:`facepy.retry.RetryPolicy` describing which errors are
+                             retried and how long to wait between retries.
+        :param float_mode: A string describing how to decode floating-point numbers in responses.
+                           See :class:`GraphAPI`.
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncGraphAPI requires aiohttp; install it with "pip install aiohttp".')
+
+        super(AsyncGraphAPI, self).__init__(
+            oauth_token, url, verify_ssl_certificate, appsecret, timeout, version, retry_policy, float_mode
+        )
+
+        self.session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the underlying session if it was created by AsyncGraphAPI.
+        """
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def get(self, path='', page=False, retry=3, **options):
+        """
+        Get an item from the Graph API.
+
+        :param path: A string describing the path to the item.
+        :param page: A boolean describing whether to return an asynchronous generator that
+                     iterates over each page of results.
+        :param retry: An integer describing how many times the request may be retried.
+        :param options: Graph API parameters such as 'limit', 'offset' or 'since'.
+
+        Returns a coroutine, or an asynchronous generator if ``page`` is ``True``.
+
+        See :meth:`GraphAPI.get`.
+        """
+        if page:
+            return self._query('GET', path, options, page, retry)
+
+        return self._expect('get "%s".' % path, self._query('GET', path, options, retry=retry))
+
+    def post(self, path='', retry=0, **data):
+        """
+        Post an item to the Graph API.
+
+        :param path: A string describing the path to the item.
+        :param retry: An integer describing how many times the request may be retried.
+        :param data: Graph API parameters such as 'message' or 'source'.
+
+        See :meth:`GraphAPI.post`.
+        """
+        return self._expect('post to "%s"' % path, self._query('POST', path, data, retry=retry))
+
+    def delete(self, path, retry=3, **data):
+        """
+        Delete an item in the Graph API.
+
+        :param path: A string describing the path to the item.
+        :param retry: An integer describing how many times the request may be retried.
+        :param data: Graph API parameters such as 'main_page_id' or 'location_page_id'.
+
+        See :meth:`GraphAPI.delete`.
+        """
+        return self._expect('delete "%s"' % path, self._query('DELETE', path, data, retry=retry))
+
+    def search(self, term, type='place', page=False, retry=3, **options):
+        """
+        Search for an item in the Graph API.
+
+        :param term: A string describing the search term.
+        :param type: A string describing the type of items to search for.
+        :param page: A boolean describing whether to return an asynchronous generator that
+                     iterates over each page of results.
+        :param retry: An integer describing how many times the request may be retried.
+        :param options: Graph API parameters, such as 'center' and 'distance'.
+
+        See :meth:`GraphAPI.search`.
+        """
+        if type != 'place':
+            raise ValueError('Unsupported type "%s". The only supported type is "place" since Graph API 2.0.' % type)
+
+        options = dict({
+            'q': term,
+            'type': type,
+        }, **options)
+
+        return self._query('GET', 'search', options, page, retry)
+
+    async def batch(self, requests, max_concurrency=1, lazy=False):
+        """
+        Make a batch request.
+
+        :param requests: An iterable of dictionaries with keys 'method', 'relative_url' and optionally 'body'.
+        :param max_concurrency: An integer describing how many batches of up to 50 requests may be
+                                in flight at once.
+        :param lazy: A boolean describing whether to yield a :class:`facepy.batching.BatchResponse`
+                     for each request, which only decodes its body once it is accessed.
+
+        Asynchronously yields a list of responses and/or exceptions in the order of the requests.
+        Requests are consumed and responses yielded 50 at a time, so ``requests`` may be a generator
+        of any length.
+        """
+        async def _post(group):
+            for request in group:
+                if 'body' in request:
+                    request['body'] = urlencode(request['body'])
+
+            return await self.post(
+                batch=json.dumps(group)
+            )
+
+        pending = deque()
+
+        try:
+            # Maximum batch size for Facebook is 50 so split up requests
+            # https://developers.facebook.com/docs/graph-api/making-multiple-requests/#limits
+            for group in _grouper(requests, 50):
+                pending.append((asyncio.ensure_future(_post(group)), group))
+
+                if len(pending) >= max_concurrency:
+                    task, group = pending.popleft()
+                    for response in self._parse_batch(await task, group, lazy):
+                        yield response
+
+            while pending:
+                task, group = pending.popleft()
+                for response in self._parse_batch(await task, group, lazy):
+                    yield response
+        finally:
+            for task, group in pending:
+                task.cancel()
+
+    async def _expect(self, action, query):
+        response = await query
+
+        if response is False:
+            raise FacebookError('Could not %s' % action)
+
+        return response
+
+    def _query(self, method, path, data=None, page=False, retry=0):
+        """
+        Fetch an object from the Graph API and parse the output.
+
+        :param method: A string describing the HTTP method.
+        :param path: A string describing the object in the Graph API.
+        :param data: A dictionary of HTTP GET parameters (for GET requests) or POST data (for POST requests).
+        :param page: A boolean describing whether to return an asynchronous generator that iterates
+                     over each page of results.
+        :param retry: An integer describing how many times the request may be retried.
+
+        Returns a coroutine, or an asynchronous generator if ``page`` is ``True``.
+        """
+        url, data = self._prepare_query(path, data)
+
+        if page:
+            return self._paginate(method, url, data, retry)
+
+        return self._first(method, url, data, retry)
+
+    async def _first(self, method, url, data, retry):
+        result, next_url = await self._load_with_retry(method, url, data, retry)
+        return result
+
+    async def _paginate(self, method, url, data, retry):
+        while url:
+            result, url = await self._load_with_retry(method, url, data, retry)
+
+            self._reset_pagination(data)
+
+            yield result
+
+    async def _load_with_retry(self, method, url, data, retry):
+        policy = self._get_retry_policy(retry)
+        started_at = time.time()
+        attempt = 0
+
+        while True:
+            try:
+                return await self._load(method, url, data)
+            except FacepyError as e:
+                log.warn("Exception on %s: %s, retries remaining: %s",
+                         url,
+                         e,
+                         policy.retries - attempt,
+                         )
+
+                attempt += 1
+                delay = policy.get_delay(attempt, e, started_at)
+
+                if not policy.should_retry(attempt, e, started_at, delay):
+                    raise
+
+                self._count('retries')
+                await asyncio.sleep(delay)
+
+    async def _load(self, method, url, data):
+        options = {}
+
+        if method in ['GET', 'DELETE']:
+            options['params'] = _stringify(data)
+            options['allow_redirects'] = True
+
+        if method in ['POST', 'PUT']:
+            data = dict(data)
+            files = self._pop_files(data)
+
+            if files:
+                form = aiohttp.FormData()
+                for key, value in _stringify(data).items():
+                    form.add_field(key, value)
+                for key, value in files.items():
+                    form.add_field(key, value)
+                options['data'] = form
+            else:
+                options['data'] = _stringify(data)
+
+        if not self.verify_ssl_certificate:
+            options['ssl'] = False
+
+        if self.timeout is not None:
+            options['timeout'] = aiohttp.ClientTimeout(total=self.timeout)
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        self._count('requests')
+
+        try:
+            async with self.session.request(method, url, **options) as response:
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            raise HTTPError(exception)
+
+        # Content-Length describes the body as it was sent, which may be compressed.
+        self._count_bytes(url, content, response.content_length)
+
+        try:
+            return self._handle_response(response.status, response.headers, content)
+        except FacepyError as exception:
+            exception.status_code = response.status
+            exception.headers = response.headers
+            raise
+
+
+def _stringify(data):
+    """
+    Convert parameter values to strings the way ``requests`` would.
+    """
+    return dict(
+        (key, value if isinstance(value, (str, bytes)) else str(value))
+        for key, value in data.items()
+        if value is not None
+    )
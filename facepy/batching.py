@@ -0,0 +1,238 @@
+import threading
+import time
+
+from concurrent.futures import Future
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from facepy.exceptions import FacebookError, FacepyError
+
+
+class AutoBatcher(object):
+    """
+    Queue GET requests and send them to the Graph API together in batch requests.
+
+    Requests are sent once ``size`` requests have been queued or ``window`` seconds after the
+    first of them was queued, whichever happens first::
+
+        with graph.autobatch() as batcher:
+            futures = [batcher.get(id, fields=['name']) for id in ids]
+
+        names = [future.result()['name'] for future in futures]
+    """
+
+    def __init__(self, graph, window=0.05, size=50, max_concurrency=1):
+        """
+        Initialize AutoBatcher.
+
+        :param graph: A :class:`facepy.GraphAPI` instance to send batch requests with.
+        :param window: A number describing how many seconds to wait for more requests.
+        :param size: An integer describing the maximum number of requests per batch (up to 50).
+        :param max_concurrency: An integer describing how many batch requests may be in flight at once.
+        """
+        self.graph = graph
+        self.window = window
+        self.size = min(size, 50)
+        self.max_concurrency = max_concurrency
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, path='', **options):
+        """
+        Queue a request to get an item from the Graph API.
+
+        :param path: A string describing the path to the item.
+        :param options: Graph API parameters such as 'fields'.
+
+        Returns a :class:`concurrent.futures.Future` that resolves to the item or
+        the exception raised for it.
+        """
+        url, data = self.graph._prepare_query(path, options)
+
+        return self._queue(url, data, path)
+
+    def _queue(self, url, data, path):
+        """
+        Queue a request for the given URL and parameters, as prepared by the graph.
+
+        :param url: A string describing the URL.
+        :param data: A dictionary of HTTP GET parameters.
+        :param path: A string describing the path to the item, for error messages.
+        """
+        future = Future()
+        request = {'method': 'GET', 'relative_url': self._get_relative_url(url, data)}
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Cannot queue requests after the batcher has been closed.')
+
+            self._pending.append((request, future, path))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+
+            self._condition.notify()
+
+        return future
+
+    def close(self):
+        """
+        Send any queued requests and stop the batcher.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join()
+
+    def _get_relative_url(self, url, data):
+        # The access token of the batch request applies to each request in it.
+        data = dict(
+            (key, value) for key, value in data.items()
+            if key not in ('access_token', 'appsecret_proof')
+        )
+
+        relative_url = url[len(self.graph._get_url('/')):]
+
+        if data:
+            relative_url = '%s%s%s' % (relative_url, '&' if '?' in relative_url else '?', urlencode(sorted(data.items())))
+
+        return relative_url
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+
+                if not self._pending:
+                    return
+
+                deadline = time.time() + self.window
+
+                while len(self._pending) < self.size * self.max_concurrency and not self._closed:
+                    remaining = deadline - time.time()
+
+                    if remaining <= 0:
+                        break
+
+                    self._condition.wait(remaining)
+
+                pending = self._pending[:self.size * self.max_concurrency]
+                self._pending = self._pending[self.size * self.max_concurrency:]
+
+            self._send(pending)
+
+    def _send(self, pending):
+        requests = [request for request, future, path in pending]
+
+        try:
+            responses = self.graph.batch(requests, max_concurrency=self.max_concurrency, lazy=True)
+
+            for (request, future, path), response in zip(pending, responses):
+                # Facebook may leave requests in a batch uncompleted, and responds to them with null.
+                if response is None:
+                    future.set_exception(FacebookError('Facebook did not complete the request for "%s".' % path))
+                    continue
+
+                try:
+                    result = response.data
+                except FacepyError as exception:
+                    exception.status_code = response.code
+                    exception.headers = response.headers
+                    future.set_exception(exception)
+                    continue
+
+                if result is False:
+                    future.set_exception(FacebookError('Could not get "%s".' % path))
+                    continue
+
+                # Give results the same shape as those of requests made on their own.
+                if isinstance(result, dict):
+                    result['headers'] = response.headers
+
+                future.set_result(result)
+        except Exception as exception:
+            for request, future, path in pending:
+                if not future.done():
+                    future.set_exception(exception)
+
+        # Don't leave anyone waiting for a response that didn't come.
+        for request, future, path in pending:
+            if not future.done():
+                future.set_exception(FacebookError('Facebook did not respond to the request for "%s".' % path))
+
+
+class BatchResponse(object):
+    """
+    The response to a request in a batch request, yielded by ``batch`` with ``lazy=True``.
+
+    The status code and headers are available immediately, while the body is only decoded
+    when :attr:`data` is first accessed::
+
+        for response in graph.batch(requests, lazy=True):
+            if response.code == 200:
+                print(response.data['id'])
+    """
+
+    def __init__(self, graph, response, request):
+        """
+        Initialize BatchResponse.
+
+        :param graph: The :class:`facepy.GraphAPI` that made the batch request.
+        :param response: A dictionary with keys 'code', 'headers' and 'body'.
+        :param request: The request the response pertains to.
+        """
+        self.code = response.get('code')
+        self.headers = dict(
+            (header['name'], header['value']) for header in response.get('headers') or []
+        )
+        self.body = response.get('body')
+        self.request = request
+
+        self._graph = graph
+        self._data = None
+        self._exception = None
+        self._parsed = False
+
+    @property
+    def data(self):
+        """
+        The object yielded by the Graph API, decoded from the body on first access.
+
+        Raises the :class:`facepy.FacebookError` or :class:`facepy.OAuthError` the response
+        describes, if any.
+        """
+        if not self._parsed:
+            try:
+                self._data = self._graph._parse(self.body)
+            except FacepyError as exception:
+                exception.request = self.request
+                self._exception = exception
+
+            self._parsed = True
+            self.body = None
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._data
+
+    def __repr__(self):
+        return '<BatchResponse %s>' % self.code
@@ -0,0 +1,122 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+try:
+    _clock = time.monotonic
+except AttributeError:
+    _clock = time.time
+
+
+class Cache(object):
+    """
+    Base class for response caches used by :class:`facepy.GraphAPI`.
+
+    Keys are strings that begin with the URL of the request followed by a question mark, so
+    backends may invalidate every entry for a URL by prefix. Subclasses should count cache
+    hits and misses in ``hits`` and ``misses``.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Get a value from the cache, returning ``None`` if it is missing or expired.
+
+        :param key: A string describing the key.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value in the cache.
+
+        :param key: A string describing the key.
+        :param value: The value to store.
+        :param ttl: A number describing how many seconds the value may be cached, or ``None``
+                    to use the default of the cache.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, url):
+        """
+        Remove every value cached for the given URL.
+
+        :param url: A string describing the URL.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove every value from the cache.
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    """
+    A thread-safe in-memory cache that evicts the least recently used values.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        """
+        Initialize MemoryCache.
+
+        :param maxsize: An integer describing the maximum number of values to keep.
+        :param ttl: A number describing how many seconds values may be cached by default,
+                    or ``None`` to cache values until they are evicted.
+        """
+        super(MemoryCache, self).__init__()
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires_at, value = self._values.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            if expires_at is not None and expires_at <= _clock():
+                self.misses += 1
+                return None
+
+            # Move the value to the end to mark it as recently used.
+            self._values[key] = (expires_at, value)
+
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.ttl
+
+        expires_at = _clock() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (expires_at, value)
+
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+    def invalidate(self, url):
+        prefix = url + '?'
+
+        with self._lock:
+            for key in [key for key in self._values if key.startswith(prefix)]:
+                del self._values[key]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
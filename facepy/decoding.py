@@ -0,0 +1,225 @@
+try:
+    import simplejson as json
+except ImportError:
+    import json  # flake8: noqa
+import codecs
+import re
+
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+FLOAT_MODES = ('decimal', 'float')
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters a number may continue with, so one that is followed by any of these in the
+# buffer may not have been read in its entirety.
+NUMBER_CHARACTERS = frozenset('0123456789.eE+-')
+
+
+def loads(content, float_mode='decimal'):
+    """
+    Decode a response from the Graph API.
+
+    :param content: A byte string or string describing JSON.
+    :param float_mode: A string describing how to decode floating-point numbers; ``'decimal'``
+                       decodes them as :class:`decimal.Decimal` with the standard library, and
+                       ``'float'`` decodes them as ``float`` with the fastest decoder installed
+                       (`orjson <https://github.com/ijl/orjson>`_ or ``ujson``). orjson decodes
+                       integers that don't fit in 64 bits as ``float`` too.
+
+    Raises ``ValueError`` if the content is not JSON.
+    """
+    if float_mode == 'decimal':
+        return json.loads(_decode(content), parse_float=Decimal)
+
+    if float_mode == 'float':
+        try:
+            if orjson is not None:
+                return orjson.loads(content)
+
+            if ujson is not None:
+                return ujson.loads(content)
+        except (ValueError, OverflowError):
+            # The fast decoders are stricter than the standard library (about UTF-8 and
+            # the size of integers, for example), so let it have a go before giving up.
+            pass
+
+        return json.loads(_decode(content))
+
+    raise ValueError('Unsupported float mode "%s"; use one of %s.' % (float_mode, ', '.join(FLOAT_MODES)))
+
+
+def iter_data(chunks, rest, float_mode='decimal'):
+    """
+    Decode a JSON object incrementally, yielding each item of its 'data' array as soon as it
+    has been read so that only one item needs to be held in memory at a time.
+
+    :param chunks: An iterable of byte strings describing a JSON object.
+    :param rest: A dictionary to decode the other keys of the object (such as 'paging') into.
+                 It is complete once the generator is exhausted.
+    :param float_mode: A string describing how to decode floating-point numbers. See :func:`loads`.
+
+    Raises ``ValueError`` if the content is not a JSON object.
+    """
+    if float_mode not in FLOAT_MODES:
+        raise ValueError('Unsupported float mode "%s"; use one of %s.' % (float_mode, ', '.join(FLOAT_MODES)))
+
+    reader = _Reader(chunks, json.JSONDecoder(parse_float=Decimal if float_mode == 'decimal' else float))
+
+    reader.expect('{')
+
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+
+        if key == 'data' and reader.peek() == '[':
+            reader.expect('[')
+
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    yield reader.value()
+
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            rest[key] = reader.value()
+
+        if reader.expect(',}') == '}':
+            return
+
+
+class _Reader(object):
+    """
+    A buffer of text decoded from an iterable of byte strings, which is read as values are
+    decoded from it.
+    """
+
+    def __init__(self, chunks, decoder):
+        self.chunks = iter(chunks)
+        self.decoder = decoder
+        self.text = ''
+        self.position = 0
+
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+        self._exhausted = False
+
+    def fill(self, size=1):
+        """
+        Read at least ``size`` more characters, returning ``False`` if the content has been
+        read in its entirety.
+        """
+        if self._exhausted:
+            return False
+
+        # Discard what has been decoded already rather than copying it along.
+        if self.position:
+            self.text = self.text[self.position:]
+            self.position = 0
+
+        parts = [self.text]
+        length = 0
+
+        while length < size:
+            chunk = next(self.chunks, None)
+
+            if chunk is None:
+                parts.append(self._decode(b'', True))
+                self._exhausted = True
+                break
+
+            part = self._decode(chunk)
+            parts.append(part)
+            length += len(part)
+
+        self.text = ''.join(parts)
+
+        return length > 0 or not self._exhausted
+
+    def peek(self):
+        """
+        Get the next character that isn't whitespace without consuming it, or an empty
+        string at the end of the content.
+        """
+        while True:
+            self.position = WHITESPACE.match(self.text, self.position).end()
+
+            if self.position < len(self.text):
+                return self.text[self.position]
+
+            if not self.fill():
+                return ''
+
+    def expect(self, characters):
+        """
+        Consume the next character that isn't whitespace, which must be one of the given characters.
+        """
+        character = self.peek()
+
+        if not character or character not in characters:
+            raise ValueError('Expected one of "%s" at character %d' % (characters, self.position))
+
+        self.position += 1
+
+        return character
+
+    def value(self):
+        """
+        Decode the next value.
+        """
+        self.peek()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.position)
+            except ValueError:
+                value, end = None, None
+
+            # Numbers may continue in the next chunk (like '0.' and '1'), so a value only counts
+            # as complete once a character that can't be part of it has been read.
+            if end is not None and (self._exhausted or (
+                    end < len(self.text) and self.text[end] not in NUMBER_CHARACTERS)):
+                self.position = end
+                return value
+
+            # Read at least as much again as is buffered, so large values aren't decoded
+            # over and over.
+            if not self.fill(max(len(self.text) - self.position, 1)) and end is None:
+                raise ValueError('Invalid JSON at character %d' % self.position)
+
+
+def _decode(content):
+    """
+    Decode the given byte string, unless the standard library can decode it by itself
+    (Python 3.6+), which saves copying it.
+    """
+    if isinstance(content, bytes) and not _LOADS_BYTES:
+        return content.decode('utf-8')
+
+    return content
+
+
+def _loads_bytes():
+    try:
+        json.loads(b'{}')
+    except TypeError:
+        return False
+
+    return True
+
+
+_LOADS_BYTES = _loads_bytes()
@@ -2,10 +2,17 @@ try:
     import simplejson as json
 except ImportError:
     import json  # flake8: noqa
-import requests
+import copy
 import hashlib
 import hmac
 import logging
+import re
+import threading
+import time
+
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
 
 try:
     import urllib.parse as urlparse
@@ -13,31 +20,657 @@ try:
 except ImportError:
     from urllib import urlencode
     import urlparse
-from decimal import Decimal
+from fnmatch import fnmatch
+from time import sleep
 
 import six
+from six.moves import queue
 
+from facepy.batching import AutoBatcher, BatchResponse
+from facepy.cache import MemoryCache
+from facepy.decoding import FLOAT_MODES, iter_data, loads
 from facepy.exceptions import *
+from facepy.retry import RetryPolicy
+from facepy.transport import HTTP2Transport, RequestsTransport, TransportResponse
 
 log = logging.getLogger(__name__)
 
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# Facebook reports errors in an object that starts with an 'error' key (or 'error_code' and
+# 'error_msg' in its legacy format), so raw responses only need to be parsed if they do.
+ERROR_PATTERN = re.compile(br'\s*\{\s*"error')
+
+# Keyword arguments can't contain brackets or colons, so parameters such as 'fields[0]' or
+# 'og:title' are given with these in their place.
+PARAMETER_NAME_REPLACEMENTS = (('_sqbro_', '['), ('_sqbrc_', ']'), ('__', ':'))
+
+# Parameter names by the keyword argument they were given as, so they are only translated once.
+_parameter_names = {}
+
+# How many levels of nested objects below the top of a response to look for 'paging' in.
+PAGING_MAX_DEPTH = 3
+
+
+def find_paging(result, max_depth=PAGING_MAX_DEPTH):
+    """
+    Get the 'paging' object of a response from the Graph API, or ``None`` if it has none.
+
+    Paging is usually at the top level of a response or in an edge expanded with field
+    expansion (like 'posts' in 'me?fields=posts'), so each level of nested objects is checked
+    before the next, and no deeper than ``max_depth`` levels below the top.
+
+    :param result: A dictionary describing the response.
+    :param max_depth: An integer describing how many levels of nested objects to check.
+    """
+    level = [result]
+
+    for depth in range(max_depth + 1):
+        for item in level:
+            if 'paging' in item:
+                return item['paging']
+
+        if depth < max_depth:
+            level = [value for item in level for value in item.values() if isinstance(value, dict)]
+
+            if not level:
+                return None
+
+
+def _nested_edges(value):
+    """
+    Yield each paginated edge nested in the given object or list that has more pages, such as
+    the comments of each post in a page of posts.
+
+    :param value: A dictionary or list from a response from the Graph API.
+    """
+    if isinstance(value, dict):
+        values = value.values()
+    elif isinstance(value, list):
+        values = value
+    else:
+        return
+
+    for item in values:
+        if isinstance(item, dict) and isinstance(item.get('data'), list) and \
+                isinstance(item.get('paging'), dict) and item['paging'].get('next'):
+            yield item
+
+        for edge in _nested_edges(item):
+            yield edge
+
+
+def _encode_parameters(options):
+    """
+    Translate the names of the given parameters and encode their values in a single pass,
+    returning a new dictionary. Lists of strings are joined by commas and other lists and
+    dictionaries are serialized as JSON.
+
+    :param options: A dictionary of parameters, as given to :meth:`GraphAPI.get` and friends.
+    """
+    parameters = {}
+
+    for key, value in options.items():
+        name = _parameter_names.get(key)
+
+        if name is None:
+            name = key
+
+            for old, new in PARAMETER_NAME_REPLACEMENTS:
+                name = name.replace(old, new)
+
+            # Names are almost always a handful of keyword arguments, but don't let them pile up.
+            if len(_parameter_names) >= 1024:
+                _parameter_names.clear()
+
+            _parameter_names[key] = name
+
+        if isinstance(value, (list, set, tuple)):
+            if all(isinstance(item, six.string_types) for item in value):
+                value = ','.join(value)
+            elif not isinstance(value, tuple):
+                value = json.dumps(value)
+        elif isinstance(value, dict):
+            value = json.dumps(value)
+
+        parameters[name] = value
+
+    return parameters
+
+
+def _grouper(iterable, n):
+    """
+    Split an iterable into lists of at most ``n`` items.
 
-class GraphAPI(object):
+    :param iterable: An iterable (which may be a generator).
+    :param n: The size of the chunk.
+    """
+    iterator = iter(iterable)
 
-    def __init__(self, oauth_token=False, url='https://graph.facebook.com', verify_ssl_certificate=True, appsecret=False, timeout=None, version=None):
+    while True:
+        group = list(islice(iterator, n))
+
+        if not group:
+            return
+
+        yield group
+
+
+def _read_ahead(iterable, size):
+    """
+    Consume an iterable in a background thread, buffering up to ``size`` items ahead of the caller.
+
+    Exceptions raised by the iterable are re-raised to the caller in order.
+
+    :param iterable: An iterable (typically a generator of pages).
+    :param size: An integer describing the maximum number of buffered items.
+    """
+    buffer = queue.Queue()
+    stopped = threading.Event()
+
+    # An item is only read once there's room for it, so no more than ``size`` items are
+    # held ahead of the caller, including the one being read.
+    slots = queue.Queue(maxsize=size)
+
+    def acquire():
+        while not stopped.is_set():
+            try:
+                slots.put(None, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        outcome = StopIteration()
+
+        try:
+            iterator = iter(iterable)
+
+            while acquire():
+                buffer.put((next(iterator), None))
+        except StopIteration:
+            pass
+        except BaseException as exception:
+            outcome = exception
+        finally:
+            buffer.put((None, outcome))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item, exception = buffer.get()
+
+            if isinstance(exception, StopIteration):
+                return
+            if exception is not None:
+                raise exception
+
+            slots.get()
+
+            yield item
+    finally:
+        stopped.set()
+
+
+class BaseGraphAPI(object):
+    """
+    The parts of :class:`GraphAPI` and :class:`facepy.AsyncGraphAPI` that don't make requests:
+    preparing URLs and parameters, parsing responses and keeping statistics.
+    """
+
+    def __init__(self, oauth_token=False, url='https://graph.facebook.com', verify_ssl_certificate=True, appsecret=False, timeout=None, version=None,
+                 retry_policy=None, float_mode='decimal'):
         """
-        Initialize GraphAPI with an OAuth access token.
+        Initialize BaseGraphAPI with an OAuth access token.
 
-        :param oauth_token: A string describing an OAuth access token.
-        :param version: A string with version ex. '2.2'.
+        See :class:`GraphAPI` for the parameters.
         """
+        if float_mode not in FLOAT_MODES:
+            raise ValueError('Unsupported float mode "%s"; use one of %s.' % (float_mode, ', '.join(FLOAT_MODES)))
+
         self.oauth_token = oauth_token
-        self.session = requests.session()
         self.url = url.strip('/')
         self.verify_ssl_certificate = verify_ssl_certificate
         self.appsecret = appsecret
         self.timeout = timeout
         self.version = version
+        self._appsecret_proof = None
+        self._url_prefix = None
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.float_mode = float_mode
+
+        # Counters of requests, retries and bytes received, for instrumentation.
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _parse_batch(self, responses, requests, lazy=False, raw=False):
+        """
+        Parse the responses to a batch request, yielding each response or exception.
+
+        :param responses: A list of dictionaries with keys 'code', 'headers' and 'body'.
+        :param requests: A list of the requests the responses pertain to.
+        :param lazy: A boolean describing whether to yield a :class:`facepy.batching.BatchResponse`
+                     for each response rather than parse it.
+        :param raw: A boolean describing whether to yield a :class:`facepy.transport.TransportResponse`
+                    for each successful response rather than parse it.
+        """
+        for response, request in zip(responses, requests):
+
+            # Facilitate for empty Graph API responses.
+            #
+            # https://github.com/jgorset/facepy/pull/30
+            if not response:
+                yield None
+                continue
+
+            if lazy:
+                yield BatchResponse(self, response, request)
+                continue
+
+            if raw:
+                body = response['body'].encode('utf-8')
+
+                if ERROR_PATTERN.match(body):
+                    try:
+                        self._parse(body)
+                    except FacepyError as exception:
+                        exception.request = request
+                        yield exception
+                        continue
+
+                # The body may only look like an error (an object with an 'error' field, say).
+                yield TransportResponse(
+                    response['code'],
+                    dict((header['name'], header['value']) for header in response.get('headers') or []),
+                    body
+                )
+                continue
+
+            try:
+                yield self._parse(response['body'])
+            except FacepyError as exception:
+                exception.request = request
+                yield exception
+
+    def _get_retry_policy(self, retry):
+        """
+        Get the retry policy for a request.
+
+        :param retry: An integer describing how many times the request may be retried, or a
+                      :class:`facepy.retry.RetryPolicy`.
+        """
+        if isinstance(retry, RetryPolicy):
+            return retry
+
+        if retry == self.retry_policy.retries:
+            return self.retry_policy
+
+        return self.retry_policy.copy(retries=retry)
+
+    def _count(self, name, value=1):
+        """
+        Add to one of the counters in :attr:`stats`.
+        """
+        with self._stats_lock:
+            self.stats[name] += value
+
+    def _count_bytes(self, url, body, wire_size=None):
+        """
+        Count the bytes received for a response in :attr:`stats`.
+
+        :param url: A string describing the URL of the request.
+        :param body: A byte string describing the decompressed body of the response.
+        :param wire_size: An integer describing how many bytes were received over the network,
+                          or ``None`` if the body wasn't compressed or the transport can't tell.
+        """
+        if wire_size is None:
+            wire_size = len(body)
+
+        with self._stats_lock:
+            self.stats['bytes_received'] += wire_size
+            self.stats['bytes_decompressed'] += len(body)
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug('Received %s bytes (%s decompressed) from %s', wire_size, len(body), _strip_credentials(url))
+
+    def _prepare_query(self, path, data=None):
+        """
+        Resolve the URL and parameters for a request, returning a tuple where the first item
+        is the URL and the second is a dictionary of parameters.
+
+        :param path: A string describing the object in the Graph API.
+        :param data: A dictionary of HTTP GET parameters (for GET requests) or POST data (for POST requests).
+        """
+        data = _encode_parameters(data) if data else {}
+
+        # Support absolute paths too
+        if not path.startswith('/'):
+            if six.PY2:
+                path = '/' + six.text_type(path.decode('utf-8'))
+            else:
+                path = '/' + path
+
+        url = self._get_url(path)
+
+        if self.oauth_token:
+            data['access_token'] = self.oauth_token
+
+        if self.appsecret and self.oauth_token:
+            data['appsecret_proof'] = self._get_appsecret_proof()
+
+        return url, data
+
+    def _pop_files(self, data):
+        """
+        Remove file-like objects from the given POST data, returning them as a dictionary.
+
+        :param data: A dictionary of POST data.
+        """
+        files = {}
+
+        for key in data:
+            if hasattr(data[key], 'read'):
+                files[key] = data[key]
+
+        for key in files:
+            data.pop(key)
+
+        return files
+
+    def _reset_pagination(self, data):
+        """
+        Remove pagination parameters that are superseded by the URL of the next page.
+
+        :param data: A dictionary of HTTP GET parameters.
+        """
+        for key in ['offset', 'until', 'since']:
+            if key in data:
+                del data[key]
+
+    def _handle_response(self, status_code, headers, content, paging_path=None):
+        """
+        Parse a response from the Graph API, returning a tuple where the first item is the
+        object yielded by the Graph API and the second is the URL for the next page of
+        results, or ``None`` if results have been exhausted.
+
+        :param status_code: An integer describing the HTTP status code.
+        :param headers: A dictionary of HTTP response headers.
+        :param content: A string describing the response body.
+        :param paging_path: A sequence of keys describing where the 'paging' object is, or ``None``
+                            to look for it.
+        """
+        if 500 <= status_code < 600:
+            # Facebook 5XX errors usually come with helpful messages
+            # as a JSON object describing the problem with the request.
+            # If this is the case, an error will be raised and we just
+            # need to re-raise it. This is most likely to happen
+            # with the Ads API.
+            # This will raise an exception if a JSON-like error object
+            # comes in the response.
+            self._parse(content)
+            # If Facebook does not provide any JSON-formatted error
+            # but just a plain-text, useless error, we'll just inform
+            # about a Facebook Internal errror occurred.
+            raise InternalFacebookError(
+                'Internal Facebook error occurred',
+                status_code
+            )
+
+        result = self._parse(content)
+
+        if isinstance(result, dict):
+            result['headers'] = headers
+
+        return result, self._get_next_url(result, paging_path)
+
+    def _get_next_url(self, result, paging_path=None):
+        """
+        Get the URL for the next page of results, or ``None`` if results have been exhausted.
+
+        :param result: The object yielded by the Graph API.
+        :param paging_path: A sequence of keys describing where the 'paging' object is, or ``None``
+                            to look for it with :func:`find_paging`.
+        """
+        if not isinstance(result, dict):
+            return None
+
+        if paging_path is None:
+            paging = find_paging(result)
+        else:
+            paging = result
+
+            for key in paging_path:
+                paging = paging.get(key) if isinstance(paging, dict) else None
+
+        if isinstance(paging, dict):
+            return paging.get('next', None)
+
+    def _get_url(self, path):
+        # When Facebook returns nested resources (like comments for a post), it
+        # prepends 'https://graph.facebook.com' by itself and so we must take
+        # care not to prepend it again. Only paths with '//' in them may have a host.
+        if '//' in path and urlparse.urlparse(path).netloc != '':
+            if self.version:
+                return '/v%s%s' % (self.version, path)
+
+            return path
+
+        return self._get_url_prefix() + path
+
+    def _get_url_prefix(self):
+        """
+        Get the base URL and version every path is appended to, which is only resolved
+        when either changes.
+        """
+        url, version = self.url, self.version
+        prefix = self._url_prefix
+
+        if prefix is None or prefix[0] != url or prefix[1] != version:
+            value = '%s/v%s' % (url, version) if version else url
+            prefix = self._url_prefix = (url, version, value)
+
+        return prefix[2]
+
+    def _get_error_params(self, error_obj):
+        error_params = {}
+        error_fields = ['message', 'code', 'error_subcode', 'error_user_msg',
+                        'is_transient', 'error_data', 'error_user_title',
+                        'fbtrace_id']
+
+        if 'error' in error_obj:
+            error_obj = error_obj['error']
+
+        for field in error_fields:
+            error_params[field] = error_obj.get(field)
+        return error_params
+
+    def _parse(self, data):
+        """
+        Parse the response from Facebook's Graph API.
+
+        :param data: A byte string or string describing the Graph API's response.
+        """
+        try:
+            data = loads(data, self.float_mode)
+        except ValueError:
+            # Responses that aren't JSON are returned as they are, decoded if possible.
+            if type(data) == type(bytes()):
+                try:
+                    data = data.decode('utf-8')
+                except UnicodeDecodeError:
+                    pass
+
+            return data
+
+        # Facebook's Graph API sometimes responds with 'true' or 'false'. Facebook offers no documentation
+        # as to the prerequisites for this type of response, though it seems that it responds with 'true'
+        # when objects are successfully deleted and 'false' upon attempting to delete or access an item that
+        # one does not have access to.
+        #
+        # For example, the API would respond with 'false' upon attempting to query a feed item without having
+        # the 'read_stream' extended permission. If you were to query the entire feed, however, it would respond
+        # with an empty list instead.
+        #
+        # Genius.
+        #
+        # We'll handle this discrepancy as gracefully as we can by implementing logic to deal with this behavior
+        # in the high-level access functions (get, post, delete etc.).
+        if type(data) is dict:
+            self._check_error(data)
+
+        return data
+
+    def _check_error(self, data):
+        """
+        Raise the error described by a response from the Graph API, if any.
+
+        :param data: A dictionary describing the Graph API's response.
+        """
+        if 'error' in data:
+            error = data['error']
+
+            if error.get('type') == "OAuthException":
+                exception = OAuthError
+            else:
+                exception = FacebookError
+
+            raise exception(**self._get_error_params(data))
+
+        # Facebook occasionally reports errors in its legacy error format.
+        if 'error_msg' in data:
+            raise FacebookError(**self._get_error_params(data))
+
+    def _get_appsecret_proof(self):
+        """
+        Get the appsecret proof for the current access token, which is only generated
+        when the access token or appsecret changes.
+        """
+        appsecret, token = self.appsecret, self.oauth_token
+        proof = self._appsecret_proof
+
+        if proof is None or proof[0] != appsecret or proof[1] != token:
+            proof = self._appsecret_proof = (appsecret, token, self._generate_appsecret_proof())
+
+        return proof[2]
+
+    def _generate_appsecret_proof(self):
+        """
+        Returns a SHA256 of the oauth_token signed by appsecret.
+        https://developers.facebook.com/docs/graph-api/securing-requests/
+        """
+        if six.PY2:
+            key = self.appsecret
+            message = self.oauth_token
+        else:
+            key = bytes(self.appsecret, 'utf-8')
+            message = bytes(self.oauth_token, 'utf-8')
+
+        return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+    # Proxy exceptions for ease of use and backwards compatibility.
+    FacebookError, OAuthError, HTTPError = FacebookError, OAuthError, HTTPError
+
+
+class GraphAPI(BaseGraphAPI):
+
+    def __init__(self, oauth_token=False, url='https://graph.facebook.com', verify_ssl_certificate=True, appsecret=False, timeout=None, version=None,
+                 cache=None, cache_ttl=None, etags=False, coalesce=False, batch_window=None,
+                 throttle=None, app_id=None, retry_policy=None, session=None, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, transport=None, http2=False, float_mode='decimal'):
+        """
+        Initialize GraphAPI with an OAuth access token.
+
+        :param oauth_token: A string describing an OAuth access token.
+        :param version: A string with version ex. '2.2'.
+        :param cache: An optional :class:`facepy.cache.Cache` to cache the responses to GET requests in.
+        :param cache_ttl: A number describing how many seconds responses may be cached, or a dictionary
+                          mapping path patterns (such as ``'me'`` or ``'*/insights'``) to seconds. If
+                          omitted, the default of the cache is used.
+        :param etags: A boolean describing whether to remember the ETag of each response and make
+                      conditional GET requests, reusing the previous response if the object is
+                      unchanged. May also be a :class:`facepy.cache.Cache` to store ETags in.
+        :param coalesce: A boolean describing whether identical GET requests made concurrently from
+                         several threads should share a single HTTP request and its result.
+        :param batch_window: A number describing how many seconds :meth:`get` may wait for other
+                             threads' requests to send them together in a batch request. If omitted,
+                             each request is sent on its own. Responses are still cached and
+                             identical requests still coalesced, but batched requests can't be
+                             conditional, so this can't be combined with ``etags``.
+        :param throttle: An optional :class:`facepy.throttle.Throttle` to pace requests by the
+                         rate limit usage Facebook reports.
+        :param app_id: A string describing the id of the app the access token belongs to, so
+                       ``throttle`` can track the app's rate limit usage across access tokens.
+                       Without it, only app access tokens share the usage of their app.
+        :param retry_policy: An optional :class:`facepy.retry.RetryPolicy` describing which errors are
+                             retried and how long to wait between retries. The ``retry`` argument of
+                             each request overrides the number of retries.
+        :param session: An optional ``requests.Session`` to make requests with, which may be shared by
+                        several instances. If omitted, a session is created with the options below.
+        :param pool_connections: An integer describing how many hosts to keep connection pools for.
+        :param pool_maxsize: An integer describing how many connections to keep open to each host.
+                             This should be at least the number of threads sharing the instance.
+        :param pool_block: A boolean describing whether requests should wait for a connection once
+                           ``pool_maxsize`` connections are in use, rather than open a connection
+                           that is discarded afterwards.
+        :param keep_alive: A boolean describing whether to reuse connections between requests.
+        :param transport: An optional :class:`facepy.transport.Transport` to make requests with, such as
+                          a :class:`facepy.transport.RequestsTransport` (the default) or a
+                          :class:`facepy.transport.Urllib3Transport`.
+                          A transport is thread-safe and may be shared by any number of instances
+                          with different access tokens, which makes creating each of them cheap.
+        :param http2: A boolean describing whether to make requests over HTTP/2 with a
+                      :class:`facepy.transport.HTTP2Transport` of ``pool_maxsize`` connections.
+        :param float_mode: A string describing how to decode floating-point numbers in responses;
+                           ``'decimal'`` as :class:`decimal.Decimal`, or ``'float'`` as ``float`` with
+                           the fastest JSON decoder installed. See :func:`facepy.decoding.loads`.
+        """
+        if batch_window is not None and etags:
+            raise ValueError('Batched requests cannot be conditional; use either batch_window or etags.')
+
+        super(GraphAPI, self).__init__(
+            oauth_token, url, verify_ssl_certificate, appsecret, timeout, version, retry_policy, float_mode
+        )
+
+        if transport is None and http2:
+            transport = HTTP2Transport(pool_maxsize, keep_alive, verify=verify_ssl_certificate)
+
+        self.transport = transport or RequestsTransport(
+            pool_connections, pool_maxsize, pool_block, keep_alive, session=session
+        )
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.throttle = throttle
+        self.app_id = app_id
+
+        if etags is True:
+            self.etags = MemoryCache(ttl=None)
+        elif etags:
+            self.etags = etags
+        else:
+            self.etags = None
+
+        self._flights = {} if coalesce else None
+        self._flights_lock = threading.Lock()
+
+        if batch_window is not None:
+            self._batcher = AutoBatcher(self, window=batch_window)
+        else:
+            self._batcher = None
+
+    @property
+    def session(self):
+        """
+        The ``requests.Session`` of the transport requests are made with, if any.
+        """
+        return getattr(self.transport, 'session', None)
+
+    @session.setter
+    def session(self, session):
+        self.transport = RequestsTransport(session=session)
 
     @classmethod
     def for_application(self, id, secret_key, api_version=None):
@@ -50,9 +683,9 @@ class GraphAPI(object):
         from facepy.utils import get_application_access_token
 
         access_token = get_application_access_token(id, secret_key, api_version=api_version)
-        return GraphAPI(access_token, version=api_version)
+        return self(access_token, version=api_version)
 
-    def get(self, path='', page=False, retry=3, **options):
+    def get(self, path='', page=False, retry=3, prefetch=0, raw=False, paging_path=None, **options):
         """
         Get an item from the Graph API.
 
@@ -60,20 +693,36 @@ class GraphAPI(object):
         :param page: A boolean describing whether to return a generator that
                      iterates over each page of results.
         :param retry: An integer describing how many times the request may be retried.
+        :param prefetch: An integer describing how many pages to fetch in the background while
+                         the current page is being processed, if ``page`` is ``True``.
+        :param raw: A boolean describing whether to return the response as a
+                    :class:`facepy.transport.TransportResponse` of its status code, headers and
+                    body without decoding it. Errors are still raised. Raw responses are
+                    neither cached nor paginated.
+        :param paging_path: A sequence of keys describing where the 'paging' object of each page
+                            is, such as ``('posts', 'paging')`` for 'me?fields=posts', if
+                            ``page`` is ``True``. By default, it is looked for in the top level
+                            of the response and then in nested objects. See :func:`find_paging`.
         :param options: Graph API parameters such as 'limit', 'offset' or 'since'.
 
         Floating-point numbers will be returned as :class:`decimal.Decimal`
-        instances.
+        instances, unless ``float_mode`` is ``'float'``.
 
         See `Facebook's Graph API documentation <http://developers.facebook.com/docs/reference/api/>`_
         for an exhaustive list of parameters.
         """
+        if page and raw:
+            raise ValueError('Raw responses cannot be paginated.')
+
         response = self._query(
             method='GET',
             path=path,
             data=options,
             page=page,
-            retry=retry
+            retry=retry,
+            prefetch=prefetch,
+            raw=raw,
+            paging_path=paging_path
         )
 
         if response is False:
@@ -81,12 +730,14 @@ class GraphAPI(object):
 
         return response
 
-    def post(self, path='', retry=0, **data):
+    def post(self, path='', retry=0, raw=False, **data):
         """
         Post an item to the Graph API.
 
         :param path: A string describing the path to the item.
         :param retry: An integer describing how many times the request may be retried.
+        :param raw: A boolean describing whether to return the response as a
+                    :class:`facepy.transport.TransportResponse` without decoding it.
         :param data: Graph API parameters such as 'message' or 'source'.
 
         See `Facebook's Graph API documentation <http://developers.facebook.com/docs/reference/api/>`_
@@ -96,7 +747,8 @@ class GraphAPI(object):
             method='POST',
             path=path,
             data=data,
-            retry=retry
+            retry=retry,
+            raw=raw
         )
 
         if response is False:
@@ -156,57 +808,157 @@ class GraphAPI(object):
 
         return response
 
-    def batch(self, requests):
+    def autobatch(self, window=0.05, max_concurrency=1):
         """
-        Make a batch request.
+        Queue GET requests to send them together in batch requests.
+
+        :param window: A number describing how many seconds to wait for more requests
+                       before sending a batch request.
+        :param max_concurrency: An integer describing how many batch requests may be in flight at once.
 
-        :param requests: A list of dictionaries with keys 'method', 'relative_url' and optionally 'body'.
+        Returns an :class:`facepy.batching.AutoBatcher` whose ``get`` method returns a future for
+        each request. Any queued requests are sent when it is used as a context manager and exits::
 
-        Yields a list of responses and/or exceptions.
+            with graph.autobatch() as batcher:
+                me = batcher.get('me')
+                friends = batcher.get('me/friends', limit=10)
+
+            me.result()
         """
+        return AutoBatcher(self, window=window, max_concurrency=max_concurrency)
 
-        for request in requests:
-            if 'body' in request:
-                request['body'] = urlencode(request['body'])
+    def iter_items(self, path='', checkpoint=None, retry=3, stream=False, paging_path=None, **options):
+        """
+        Iterate over each item of a paginated edge in the Graph API.
 
-        def _grouper(complete_list, n=1):
-            """
-            Batches a list into constant size chunks.
+        :param path: A string describing the path to the edge.
+        :param checkpoint: A checkpoint from :attr:`ItemIterator.checkpoint` to resume from.
+        :param retry: An integer describing how many times each request may be retried.
+        :param stream: A boolean describing whether to decode each page as it is received and
+                       yield its items as soon as they have been read, rather than read the
+                       whole page first. This keeps memory flat for pages with a high 'limit'.
+        :param paging_path: A sequence of keys describing where the 'paging' object of each page
+                            is. See :meth:`get`.
+        :param options: Graph API parameters such as 'limit' or 'fields'.
 
-            :param complete_list: A input list (not a generator).
-            :param n: The size of the chunk.
+        Returns an :class:`ItemIterator` that yields the items in each page's 'data' and
+        keeps track of its progress so an interrupted crawl can be resumed without
+        fetching completed pages again::
 
-            Adapted from <http://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks-in-python>
-            """
+            items = graph.iter_items('me/posts', limit=100)
 
-            for i in range(0, len(complete_list), n):
-                yield complete_list[i:i + n]
+            for item in items:
+                save(item, checkpoint=items.checkpoint)
 
-        responses = []
+            # Later, pass the same path and options to pick up where you left off.
+            items = graph.iter_items('me/posts', checkpoint=saved_checkpoint, limit=100)
+        """
+        return ItemIterator(self, path, options, checkpoint, retry, stream, paging_path)
 
-        # Maximum batch size for Facebook is 50 so split up requests
-        # https://developers.facebook.com/docs/graph-api/making-multiple-requests/#limits
-        for group in _grouper(requests, 50):
-            responses += self.post(
+    def fetch_nested_pages(self, result, max_concurrency=4, retry=3):
+        """
+        Fetch the remaining pages of every paginated edge nested in a response, such as the
+        comments of each post in 'me/posts?fields=comments', and add their items to the edge.
+
+        :param result: A dictionary describing a response from the Graph API, which is updated in place.
+        :param max_concurrency: An integer describing how many pages may be fetched at once.
+        :param retry: An integer describing how many times each request may be retried.
+
+        The pages of each edge are fetched one after the other, but those of different edges
+        are fetched concurrently. Edges nested in the items of the pages that are fetched
+        (like the comments of posts on the second page of posts) are completed as well, but
+        the next page of ``result`` itself is not::
+
+            for page in graph.get('me/posts', fields='comments{message}', page=True):
+                graph.fetch_nested_pages(page)
+
+        Returns ``result``.
+        """
+        data = self._prepare_query('')[1]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            pending = {}
+
+            def fetch(edges):
+                for edge in edges:
+                    future = executor.submit(self._load_with_retry, 'GET', edge['paging']['next'], dict(data), retry)
+                    pending[future] = edge
+
+            fetch(_nested_edges(result))
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    edge = pending.pop(future)
+                    page = future.result()[0]
+
+                    if not isinstance(page, dict):
+                        continue
+
+                    items = page.get('data') or []
+                    edge['data'].extend(items)
+                    edge['paging'] = page.get('paging') or {}
+
+                    fetch(_nested_edges(items))
+
+                    if edge['paging'].get('next'):
+                        fetch([edge])
+
+        return result
+
+    def batch(self, requests, max_concurrency=1, lazy=False, raw=False):
+        """
+        Make a batch request.
+
+        :param requests: An iterable of dictionaries with keys 'method', 'relative_url' and optionally 'body'.
+        :param max_concurrency: An integer describing how many batches of up to 50 requests may be
+                                in flight at once.
+        :param lazy: A boolean describing whether to yield a :class:`facepy.batching.BatchResponse`
+                     for each request, which only decodes its body once it is accessed.
+        :param raw: A boolean describing whether to yield a :class:`facepy.transport.TransportResponse`
+                    of the status code, headers and body of each response without decoding it.
+                    Errors are still yielded as exceptions.
+
+        Yields a list of responses and/or exceptions in the order of the requests. Requests are
+        consumed and responses yielded 50 at a time, so ``requests`` may be a generator of any length.
+        """
+
+        def _post(group):
+            for request in group:
+                if 'body' in request:
+                    request['body'] = urlencode(request['body'])
+
+            return self.post(
                 batch=json.dumps(group)
             )
 
-        for response, request in zip(responses, requests):
+        # Maximum batch size for Facebook is 50 so split up requests
+        # https://developers.facebook.com/docs/graph-api/making-multiple-requests/#limits
+        groups = _grouper(requests, 50)
 
-            # Facilitate for empty Graph API responses.
-            #
-            # https://github.com/jgorset/facepy/pull/30
-            if not response:
-                yield None
-                continue
+        if max_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                pending = deque()
 
-            try:
-                yield self._parse(response['body'])
-            except FacepyError as exception:
-                exception.request = request
-                yield exception
+                for group in groups:
+                    pending.append((executor.submit(_post, group), group))
 
-    def _query(self, method, path, data=None, page=False, retry=0):
+                    if len(pending) >= max_concurrency:
+                        future, group = pending.popleft()
+                        for response in self._parse_batch(future.result(), group, lazy, raw):
+                            yield response
+
+                while pending:
+                    future, group = pending.popleft()
+                    for response in self._parse_batch(future.result(), group, lazy, raw):
+                        yield response
+        else:
+            for group in groups:
+                for response in self._parse_batch(_post(group), group, lazy, raw):
+                    yield response
+
+    def _query(self, method, path, data=None, page=False, retry=0, prefetch=0, raw=False, paging_path=None):
         """
         Fetch an object from the Graph API and parse the output, returning a tuple where the first item
         is the object yielded by the Graph API and the second is the URL for the next page of results, or
@@ -217,234 +969,448 @@ class GraphAPI(object):
         :param data: A dictionary of HTTP GET parameters (for GET requests) or POST data (for POST requests).
         :param page: A boolean describing whether to return an iterator that iterates over each page of results.
         :param retry: An integer describing how many times the request may be retried.
+        :param prefetch: An integer describing how many pages to fetch ahead of the consumer.
+        :param raw: A boolean describing whether to return a :class:`facepy.transport.TransportResponse`
+                    rather than parse the response.
+        :param paging_path: A sequence of keys describing where the 'paging' object is, or ``None``.
         """
+        url, data = self._prepare_query(path, data)
 
-        if(data):
-            data = dict(
-                (k.replace('_sqbro_', '['), v) for k, v in data.items())
-            data = dict(
-                (k.replace('_sqbrc_', ']'), v) for k, v in data.items())
-            data = dict(
-                (k.replace('__', ':'), v) for k, v in data.items())
-        data = data or {}
+        if raw:
+            return self._load_with_retry(method, url, data, retry, raw=True)[0]
 
-        def load(method, url, data):
-            for key in data:
-                value = data[key]
+        if self.cache is not None and not page:
+            return self._query_with_cache(method, path, url, data, retry)
 
-                if isinstance(value, (list, dict, set)):
-                    data[key] = json.dumps(value)
+        if page and prefetch:
+            return _read_ahead(self._paginate(method, url, data, retry, paging_path), prefetch)
+        elif page:
+            return self._paginate(method, url, data, retry, paging_path)
+        else:
+            return self._fetch(method, url, data, retry)
 
+    def _query_with_cache(self, method, path, url, data, retry=0):
+        """
+        Fetch an object from the cache if possible. GET requests are cached and any
+        other request invalidates the cache for its URL.
+        """
+        if method != 'GET':
             try:
-                if method in ['GET', 'DELETE']:
-                    response = self.session.request(
-                        method, url, params=data, allow_redirects=True,
-                        verify=self.verify_ssl_certificate, timeout=self.timeout
-                    )
-
-                if method in ['POST', 'PUT']:
-                    files = {}
-
-                    for key in data:
-                        if hasattr(data[key], 'read'):
-                            files[key] = data[key]
-
-                    for key in files:
-                        data.pop(key)
-
-                    response = self.session.request(
-                        method, url, data=data, files=files,
-                        verify=self.verify_ssl_certificate, timeout=self.timeout
-                    )
-
-                if 500 <= response.status_code < 600:
-                    # Facebook 5XX errors usually come with helpful messages
-                    # as a JSON object describing the problem with the request.
-                    # If this is the case, an error will be raised and we just
-                    # need to re-raise it. This is most likely to happen
-                    # with the Ads API.
-                    # This will raise an exception if a JSON-like error object
-                    # comes in the response.
-                    self._parse(response.content)
-                    # If Facebook does not provide any JSON-formatted error
-                    # but just a plain-text, useless error, we'll just inform
-                    # about a Facebook Internal errror occurred.
-                    raise FacebookError(
-                        'Internal Facebook error occurred',
-                        response.status_code
-                    )
-
-            except requests.RequestException as exception:
-                raise HTTPError(exception)
-
-            result = self._parse(response.content)
-            if isinstance(result, dict):
-                result['headers'] = response.headers
-
-            def nested_get(needle, haystack):
-                """
-                Get the the given key anywhere in a nested dictionary.
-                """
-                if needle in haystack:
-                    return haystack[needle]
-                for key, value in haystack.items():
-                    if isinstance(value, dict):
-                        item = nested_get(needle, value)
-                        if item is not None:
-                            return item
+                return self._load_with_retry(method, url, data, retry)[0]
+            finally:
+                self.cache.invalidate(url)
 
-            if isinstance(result, dict):
-                paging = nested_get('paging', result)
-                if paging:
-                    next_url = paging.get('next', None)
-                else:
-                    next_url = None
-            else:
-                next_url = None
+        ttl = self._get_cache_ttl(path)
 
-            return result, next_url
+        if ttl == 0:
+            return self._fetch(method, url, data, retry)
 
-        def load_with_retry(method, url, data):
-            remaining_retries = retry
-            while True:
-                try:
-                    return load(method, url, data)
-                except FacepyError as e:
-                    log.warn("Exception on %s: %s, retries remaining: %s",
-                             url,
-                             e,
-                             remaining_retries,
-                             )
-                    if remaining_retries > 0:
-                        remaining_retries -= 1
-                    else:
-                        raise
-
-        def paginate(method, url, data):
-            while url:
-                result, url = load_with_retry(method, url, data)
-
-                # Reset pagination parameters.
-                for key in ['offset', 'until', 'since']:
-                    if key in data:
-                        del data[key]
-
-                yield result
-
-        # Convert option lists to comma-separated values.
-        for key in data:
-            if isinstance(data[key], (list, set, tuple)) and all([isinstance(item, six.string_types) for item in data[key]]):
-                data[key] = ','.join(data[key])
+        key = self._get_cache_key(url, data)
+        result = self.cache.get(key)
 
-        # Support absolute paths too
-        if not path.startswith('/'):
-            if six.PY2:
-                path = '/' + six.text_type(path.decode('utf-8'))
-            else:
-                path = '/' + path
+        if result is None:
+            result = self._fetch(method, url, data, retry)
 
-        url = self._get_url(path)
+            if result is not False:
+                self.cache.set(key, copy.deepcopy(result), ttl)
 
-        if self.oauth_token:
-            data['access_token'] = self.oauth_token
+            return result
 
-        if self.appsecret and self.oauth_token:
-            data['appsecret_proof'] = self._generate_appsecret_proof()
+        return copy.deepcopy(result)
+
+    def _fetch(self, method, url, data, retry=0):
+        """
+        Load the given URL, sharing the result of an identical GET request that is already
+        in flight if requests are coalesced.
+        """
+        batch = self._batcher is not None and method == 'GET'
+
+        if self._flights is None or method != 'GET':
+            return self._load_with_retry(method, url, data, retry, batch=batch)[0]
+
+        key = self._get_cache_key(url, data)
+
+        with self._flights_lock:
+            future = self._flights.get(key)
+            leader = future is None
+
+            if leader:
+                future = self._flights[key] = Future()
+
+        if not leader:
+            return copy.deepcopy(future.result())
 
-        if page:
-            return paginate(method, url, data)
+        try:
+            result = self._load_with_retry(method, url, data, retry, batch=batch)[0]
+        except BaseException as exception:
+            future.set_exception(exception)
+            raise
         else:
-            return load_with_retry(method, url, data)[0]
+            # Followers copy the result on other threads, so they mustn't see the leader's changes to it.
+            future.set_result(copy.deepcopy(result))
+            return result
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+
+    def _get_cache_key(self, url, data):
+        """
+        Get the key to cache the response to a GET request under. The access token is
+        hashed rather than included verbatim.
+        """
+        params = sorted(
+            (key, value) for key, value in data.items()
+            if key not in ('access_token', 'appsecret_proof')
+        )
 
-    def _get_url(self, path):
-        # When Facebook returns nested resources (like comments for a post), it
-        # prepends 'https://graph.facebook.com' by itself and so we must take
-        # care not to prepend it again.
-        if urlparse.urlparse(path).netloc == '':
-            url = self.url
+        key = '%s?%s' % (url, urlencode(params))
+
+        if self.oauth_token:
+            key += '#%s' % hashlib.sha256(self.oauth_token.encode('utf-8')).hexdigest()
+
+        return key
+
+    def _get_cache_ttl(self, path):
+        """
+        Get the number of seconds the response for the given path may be cached, or ``None``
+        for the default of the cache.
+        """
+        if not isinstance(self.cache_ttl, dict):
+            return self.cache_ttl
+
+        path = path.lstrip('/')
+        patterns = [pattern for pattern in self.cache_ttl if fnmatch(path, pattern)]
+
+        if patterns:
+            # The longest pattern is the most specific.
+            return self.cache_ttl[max(patterns, key=len)]
+
+    def _paginate(self, method, url, data, retry=0, paging_path=None):
+        """
+        Yield each page of results, starting with the given URL.
+        """
+        while url:
+            result, url = self._load_with_retry(method, url, data, retry, paging_path=paging_path)
+
+            self._reset_pagination(data)
+
+            yield result
+
+    def _load_with_retry(self, method, url, data, retry=0, raw=False, stream=False, paging_path=None, batch=False):
+        """
+        Load the given URL, retrying errors according to the retry policy.
+
+        :param retry: An integer describing how many times the request may be retried, or a
+                      :class:`facepy.retry.RetryPolicy`.
+        :param raw: A boolean describing whether to return the response rather than parse it.
+        :param stream: A boolean describing whether to stream the response. See :meth:`_load_stream`.
+        :param paging_path: A sequence of keys describing where the 'paging' object is, or ``None``.
+        :param batch: A boolean describing whether to send the request in a batch request with
+                      others made within ``batch_window``. See :meth:`_load_batched`.
+        """
+        policy = self._get_retry_policy(retry)
+        started_at = time.time()
+        attempt = 0
+
+        while True:
+            try:
+                if stream:
+                    return self._load_stream(method, url, data)
+
+                if batch:
+                    return self._load_batched(url, data)
+
+                return self._load(method, url, data, raw, paging_path)
+            except FacepyError as e:
+                log.warn("Exception on %s: %s, retries remaining: %s",
+                         url,
+                         e,
+                         policy.retries - attempt,
+                         )
+
+                attempt += 1
+                delay = policy.get_delay(attempt, e, started_at)
+
+                if not policy.should_retry(attempt, e, started_at, delay):
+                    raise
+
+                self._count('retries')
+                sleep(delay)
+
+    def _count_chunks(self, url, chunks):
+        """
+        Count the bytes received for a streamed response in :attr:`stats` as its chunks are read.
+
+        :param url: A string describing the URL of the request.
+        :param chunks: An iterator of byte strings describing the decompressed body of the response.
+        """
+        for chunk in chunks:
+            self._count_bytes(url, chunk)
+            yield chunk
+
+    def _load(self, method, url, data, raw=False, paging_path=None):
+        """
+        Load the given URL, returning a tuple where the first item is the object yielded by the
+        Graph API and the second is the URL for the next page of results, or ``None``.
+
+        If ``raw`` is ``True``, the first item is the :class:`facepy.transport.TransportResponse`
+        instead, which is only parsed if it looks like an error.
+        """
+        headers = None
+
+        if self.etags is not None and method == 'GET' and not raw:
+            key = self._get_cache_key(url, data)
+            cached = self.etags.get(key)
+
+            if cached is not None:
+                headers = {'If-None-Match': cached[0]}
         else:
-            url = ''
+            key = cached = None
+
+        if self.throttle is not None:
+            self.throttle.acquire(self.oauth_token, self.app_id)
 
-        if self.version:
-            url = '%s/v%s%s' % (url, self.version, path)
+        self._count('requests')
+
+        if method in ['GET', 'DELETE']:
+            response = self.transport.send(
+                method, url, params=data, headers=headers,
+                timeout=self.timeout, verify=self.verify_ssl_certificate
+            )
         else:
-            url = '%s%s' % (url, path)
+            files = self._pop_files(data)
 
-        return url
+            response = self.transport.send(
+                method, url, data=data, files=files,
+                timeout=self.timeout, verify=self.verify_ssl_certificate
+            )
 
-    def _get_error_params(self, error_obj):
-        error_params = {}
-        error_fields = ['message', 'code', 'error_subcode', 'error_user_msg',
-                        'is_transient', 'error_data', 'error_user_title',
-                        'fbtrace_id']
+        self._count_bytes(url, response.body, response.wire_size)
 
-        if 'error' in error_obj:
-            error_obj = error_obj['error']
+        if self.throttle is not None:
+            self.throttle.update(self.oauth_token, response.headers, self.app_id)
 
-        for field in error_fields:
-            error_params[field] = error_obj.get(field)
-        return error_params
+        if response.status == 304 and cached is not None:
+            # The object is unchanged, so reuse the response we've parsed before.
+            result = dict(copy.deepcopy(cached[1]), headers=response.headers)
+            return result, self._get_next_url(result, paging_path)
 
-    def _parse(self, data):
+        try:
+            if raw:
+                if response.status >= 400 or ERROR_PATTERN.match(response.body):
+                    self._handle_response(response.status, response.headers, response.body)
+
+                if response.body == b'false':
+                    return False, None
+
+                return response, None
+
+            result, next_url = self._handle_response(
+                response.status, response.headers, response.body, paging_path
+            )
+        except FacepyError as exception:
+            exception.status_code = response.status
+            exception.headers = response.headers
+            raise
+
+        if key is not None and isinstance(result, dict) and response.headers.get('ETag'):
+            self.etags.set(key, (response.headers['ETag'], copy.deepcopy(result)))
+
+        return result, next_url
+
+    def _load_batched(self, url, data):
         """
-        Parse the response from Facebook's Graph API.
+        Get the given URL in a batch request with the other requests made within ``batch_window``,
+        returning a tuple like :meth:`_load`.
+        """
+        result = self._batcher._queue(url, data, url).result()
 
-        :param data: A string describing the Graph API's response.
+        return result, self._get_next_url(result)
+
+    def _load_stream(self, method, url, data):
+        """
+        Load the given URL, returning a tuple where the first item is a generator that yields
+        each item of the 'data' array of the response as it is read, and the second is a
+        dictionary of the rest of the response, which is complete once the generator is exhausted.
         """
-        if type(data) == type(bytes()):
+        if self.throttle is not None:
+            self.throttle.acquire(self.oauth_token, self.app_id)
+
+        self._count('requests')
+
+        response = self.transport.stream(
+            method, url, params=data, timeout=self.timeout, verify=self.verify_ssl_certificate
+        )
+
+        if self.throttle is not None:
+            self.throttle.update(self.oauth_token, response.headers, self.app_id)
+
+        body = self._count_chunks(url, response.body)
+        rest = {}
+
+        if response.status >= 400:
+            # Errors are small, so they're read in their entirety.
             try:
-                data = data.decode('utf-8')
-            except UnicodeDecodeError:
-                return data
+                result, next_url = self._handle_response(response.status, response.headers, b''.join(body))
+            except FacepyError as exception:
+                exception.status_code = response.status
+                exception.headers = response.headers
+                raise
 
-        try:
-            data = json.loads(data, parse_float=Decimal)
-        except ValueError:
-            return data
+            if isinstance(result, dict):
+                rest.update(result)
 
-        # Facebook's Graph API sometimes responds with 'true' or 'false'. Facebook offers no documentation
-        # as to the prerequisites for this type of response, though it seems that it responds with 'true'
-        # when objects are successfully deleted and 'false' upon attempting to delete or access an item that
-        # one does not have access to.
-        #
-        # For example, the API would respond with 'false' upon attempting to query a feed item without having
-        # the 'read_stream' extended permission. If you were to query the entire feed, however, it would respond
-        # with an empty list instead.
-        #
-        # Genius.
-        #
-        # We'll handle this discrepancy as gracefully as we can by implementing logic to deal with this behavior
-        # in the high-level access functions (get, post, delete etc.).
-        if type(data) is dict:
-            if 'error' in data:
-                error = data['error']
+            return iter(rest.pop('data', None) or []), rest
 
-                if error.get('type') == "OAuthException":
-                    exception = OAuthError
-                else:
-                    exception = FacebookError
+        def read():
+            try:
+                for item in iter_data(body, rest, self.float_mode):
+                    yield item
+            except ValueError:
+                raise FacebookError('Could not get "%s".' % url)
 
-                raise exception(**self._get_error_params(data))
+            self._check_error(rest)
 
-            # Facebook occasionally reports errors in its legacy error format.
-            if 'error_msg' in data:
-                raise FacebookError(**self._get_error_params(data))
+            rest['headers'] = response.headers
 
-        return data
+        return read(), rest
 
-    def _generate_appsecret_proof(self):
+
+class ItemIterator(six.Iterator):
+    """
+    Iterator over the items of a paginated edge, returned by :meth:`GraphAPI.iter_items`.
+    """
+
+    def __init__(self, graph, path, options, checkpoint=None, retry=3, stream=False, paging_path=None):
+        self.graph = graph
+        self.retry = retry
+        self.stream = stream
+        self.paging_path = paging_path
+
+        self._url, self._data = graph._prepare_query(path, options)
+        self._page_url = None
+        self._items = []
+        self._stream = None
+        self._rest = None
+        self._offset = 0
+        self._next_url = None
+        self._loaded = False
+        self._done = False
+
+        if checkpoint:
+            self._page_url = checkpoint.get('url')
+            self._offset = checkpoint.get('offset', 0)
+            self._done = checkpoint.get('done', False)
+
+            # Pages beyond the first carry their own pagination parameters.
+            if self._page_url:
+                self.graph._reset_pagination(self._data)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._done:
+            if not self._loaded:
+                self._load()
+
+            if self._stream is not None:
+                item = next(self._stream, _END)
+
+                if item is not _END:
+                    self._offset += 1
+                    return item
+
+                self._stream = None
+                self._next_url = self.graph._get_next_url(self._rest, self.paging_path)
+
+            if self._offset < len(self._items):
+                item = self._items[self._offset]
+                self._offset += 1
+                return item
+
+            if not self._next_url:
+                self._done = True
+                break
+
+            self._page_url = self._next_url
+            self._offset = 0
+            self._loaded = False
+
+        raise StopIteration
+
+    def _load(self):
+        url = self._page_url or self._url
+
+        if self.stream:
+            self._stream, self._rest = self.graph._load_with_retry('GET', url, self._data, self.retry, stream=True)
+            self._items = []
+            self._next_url = None
+
+            # Skip the items of the page that were consumed before the checkpoint.
+            for _ in islice(self._stream, self._offset):
+                pass
+        else:
+            result, next_url = self.graph._load_with_retry(
+                'GET', url, self._data, self.retry, paging_path=self.paging_path
+            )
+
+            if isinstance(result, dict):
+                self._items = result.get('data') or []
+            else:
+                self._items = []
+
+            self._next_url = next_url
+
+        self.graph._reset_pagination(self._data)
+
+        self._loaded = True
+
+    @property
+    def checkpoint(self):
         """
-        Returns a SHA256 of the oauth_token signed by appsecret.
-        https://developers.facebook.com/docs/graph-api/securing-requests/
+        A JSON-serializable dictionary describing the progress of the iterator.
+
+        The access token and appsecret proof are removed from URLs in the checkpoint.
         """
-        if six.PY2:
-            key = self.appsecret
-            message = self.oauth_token
+        exhausted = self._loaded and self._stream is None and self._offset >= len(self._items)
+
+        if self._done or (exhausted and not self._next_url):
+            return {'url': None, 'offset': 0, 'done': True}
+
+        if exhausted:
+            url, offset = self._next_url, 0
         else:
-            key = bytes(self.appsecret, 'utf-8')
-            message = bytes(self.oauth_token, 'utf-8')
+            url, offset = self._page_url, self._offset
 
-        return hmac.new(key, message, hashlib.sha256).hexdigest()
+        return {'url': _strip_credentials(url), 'offset': offset, 'done': False}
 
-    # Proxy exceptions for ease of use and backwards compatibility.
-    FacebookError, OAuthError, HTTPError = FacebookError, OAuthError, HTTPError
+    @property
+    def cursor(self):
+        """
+        The 'after' cursor of the page the iterator will resume from, or ``None``.
+        """
+        url = self.checkpoint['url']
+
+        if url:
+            return urlparse.parse_qs(urlparse.urlparse(url).query).get('after', [None])[0]
+
+
+# Marks the end of a stream of items.
+_END = object()
+
+
+def _strip_credentials(url):
+    """
+    Remove the access token and appsecret proof from the given URL.
+    """
+    if not url:
+        return url
+
+    components = urlparse.urlparse(url)
+    query = [
+        (key, value) for key, value in urlparse.parse_qsl(components.query, keep_blank_values=True)
+        if key not in ('access_token', 'appsecret_proof')
+    ]
+
+    return urlparse.urlunparse(components._replace(query=urlencode(query)))
@@ -0,0 +1,122 @@
+import random
+import time
+
+from facepy.exceptions import FacebookError, HTTPError, InternalFacebookError, OAuthError
+
+# Error codes Facebook uses for temporary issues and rate limiting.
+#
+# https://developers.facebook.com/docs/graph-api/using-graph-api/error-handling/
+# https://developers.facebook.com/docs/graph-api/overview/rate-limiting/
+TRANSIENT_ERROR_CODES = frozenset([1, 2, 4, 17, 32, 341, 368, 613] + list(range(80000, 80015)))
+
+
+class RetryPolicy(object):
+    """
+    Decide whether and when failed requests to the Graph API are retried.
+
+    Transport errors, internal Facebook errors, errors Facebook flags as transient and
+    rate limiting errors are retried with exponential backoff; other errors (such as
+    invalid parameters or expired access tokens) are raised immediately::
+
+        graph = GraphAPI(access_token, retry_policy=RetryPolicy(backoff=1, deadline=60))
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, jitter=True, deadline=None):
+        """
+        Initialize RetryPolicy.
+
+        :param retries: An integer describing how many times a request may be retried.
+        :param backoff: A number describing how many seconds to wait before the first retry. The
+                        delay doubles for each subsequent retry.
+        :param max_backoff: A number describing the maximum number of seconds between retries.
+        :param jitter: A boolean describing whether to randomize delays so clients that failed
+                       at the same time don't retry at the same time.
+        :param deadline: A number describing how many seconds a request and all of its retries
+                         may take in total, or ``None`` for no limit.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def is_retryable(self, exception):
+        """
+        Determine whether the request that raised the given exception may be retried.
+
+        :param exception: A :class:`facepy.FacepyError`.
+        """
+        if isinstance(exception, (HTTPError, InternalFacebookError)):
+            return True
+
+        if isinstance(exception, FacebookError):
+            if exception.is_transient:
+                return True
+
+            if isinstance(exception, OAuthError):
+                return False
+
+            return exception.code in TRANSIENT_ERROR_CODES
+
+        return False
+
+    def get_delay(self, attempt, exception=None, started_at=None):
+        """
+        Get the number of seconds to wait before the given retry.
+
+        A ``Retry-After`` header is honored, but never beyond ``max_backoff`` or the deadline.
+
+        :param attempt: An integer describing the retry, starting with 1.
+        :param exception: The :class:`facepy.FacepyError` that caused the retry.
+        :param started_at: A number describing when the first attempt was made, as returned by
+                           :func:`time.time`, to keep the delay within the deadline.
+        """
+        retry_after = _get_retry_after(exception)
+
+        if retry_after is not None:
+            delay = min(retry_after, self.max_backoff)
+        else:
+            delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+            if self.jitter:
+                delay = random.uniform(0, delay)
+
+        if self.deadline is not None and started_at is not None:
+            delay = min(delay, max(started_at + self.deadline - time.time(), 0))
+
+        return delay
+
+    def should_retry(self, attempt, exception, started_at, delay=0):
+        """
+        Determine whether to make the given retry.
+
+        :param attempt: An integer describing the retry, starting with 1.
+        :param exception: The :class:`facepy.FacepyError` that caused the retry.
+        :param started_at: A number describing when the first attempt was made, as returned by :func:`time.time`.
+        :param delay: A number describing how many seconds would pass before the retry.
+        """
+        if attempt > self.retries or not self.is_retryable(exception):
+            return False
+
+        if self.deadline is not None and time.time() + delay - started_at > self.deadline:
+            return False
+
+        return True
+
+    def copy(self, retries):
+        """
+        Copy this policy with a different number of retries.
+        """
+        return RetryPolicy(retries, self.backoff, self.max_backoff, self.jitter, self.deadline)
+
+
+def _get_retry_after(exception):
+    headers = getattr(exception, 'headers', None)
+
+    if not headers:
+        return None
+
+    try:
+        return max(float(headers.get('Retry-After')), 0)
+    except (TypeError, ValueError):
+        return None
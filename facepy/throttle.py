@@ -0,0 +1,239 @@
+try:
+    import simplejson as json
+except ImportError:
+    import json  # flake8: noqa
+import hashlib
+import numbers
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class Throttle(object):
+    """
+    Pace requests to stay within Facebook's rate limits.
+
+    Facebook reports how much of each rate limit has been used in the ``X-App-Usage``,
+    ``X-Page-Usage``, ``X-Ad-Account-Usage`` and ``X-Business-Use-Case-Usage`` headers of
+    its responses. Once the usage that applies to an access token exceeds ``threshold``
+    percent, requests with it are paced with a token bucket that slows down as usage
+    approaches 100%, and requests are held back entirely while Facebook reports that
+    access has been blocked::
+
+        graph = GraphAPI(access_token, throttle=Throttle(threshold=75))
+
+    The same throttle may be shared by several :class:`facepy.GraphAPI` instances. It keeps
+    track of at most ``maxsize`` access tokens, apps and businesses, forgetting those it has
+    heard from least recently.
+    """
+
+    def __init__(self, threshold=75, rate=None, throttled_rate=1.0, maxsize=10000):
+        """
+        Initialize Throttle.
+
+        :param threshold: A number describing the percentage of a rate limit to stay under.
+        :param rate: A number describing how many requests per second may be made with each access
+                     token while usage is under the threshold, or ``None`` for no limit.
+        :param throttled_rate: A number describing how many requests per second may be made with
+                               an access token once usage exceeds the threshold. The rate decreases
+                               linearly to a tenth of this as usage approaches 100%.
+        :param maxsize: An integer describing how many access tokens, apps and businesses to keep
+                        the usage, pace and blocks of.
+        """
+        self.threshold = threshold
+        self.rate = rate
+        self.throttled_rate = throttled_rate
+        self.maxsize = maxsize
+
+        self._usage = OrderedDict()
+        self._blocked_until = OrderedDict()
+        self._businesses = OrderedDict()
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def usage(self):
+        """
+        A dictionary mapping scopes to the highest percentage of a rate limit used in them.
+
+        Scopes are tuples like ``('app', <app id>)``, ``('token', <token digest>)``,
+        ``('ad_account', <token digest>)`` or ``('business', <business id>)``. The usage of apps
+        whose id isn't known is scoped by the digest of the access token instead.
+        """
+        with self._lock:
+            return dict(self._usage)
+
+    def acquire(self, token, app_id=None):
+        """
+        Wait until a request may be made with the given access token.
+
+        :param token: A string describing the access token.
+        :param app_id: A string describing the id of the app the access token belongs to, if it
+                       isn't an app access token (which includes it).
+        """
+        key = _digest(token)
+        app = _get_app_scope(token, key, app_id)
+
+        while True:
+            with self._lock:
+                now = time.time()
+                usage, blocked_until = self._get_usage(key, app)
+
+                if blocked_until > now:
+                    delay = blocked_until - now
+                else:
+                    rate = self._get_rate(usage)
+
+                    if rate is None:
+                        return
+
+                    tokens, updated_at = self._buckets.get(key, (max(rate, 1), now))
+                    tokens = min(max(rate, 1), tokens + (now - updated_at) * rate)
+
+                    if tokens >= 1:
+                        self._remember(self._buckets, key, (tokens - 1, now))
+                        return
+
+                    self._remember(self._buckets, key, (tokens, now))
+                    delay = (1 - tokens) / rate
+
+            time.sleep(delay)
+
+    def update(self, token, headers, app_id=None):
+        """
+        Record the usage Facebook reported in the headers of a response. Headers that can't
+        be parsed are ignored.
+
+        :param token: A string describing the access token the request was made with.
+        :param headers: A dictionary of HTTP response headers.
+        :param app_id: A string describing the id of the app the access token belongs to. See :meth:`acquire`.
+        """
+        key = _digest(token)
+        now = time.time()
+
+        with self._lock:
+            app_usage = _load(headers.get('X-App-Usage'))
+            if app_usage:
+                self._remember(self._usage, _get_app_scope(token, key, app_id), _percentage(app_usage))
+
+            page_usage = _load(headers.get('X-Page-Usage'))
+            if page_usage:
+                self._remember(self._usage, ('token', key), _percentage(page_usage))
+
+            ad_account_usage = _load(headers.get('X-Ad-Account-Usage'))
+            if ad_account_usage:
+                self._remember(self._usage, ('ad_account', key), _number(ad_account_usage.get('acc_id_util_pct')))
+
+                reset = _number(ad_account_usage.get('reset_time_duration'))
+                if reset:
+                    self._remember(self._blocked_until, ('ad_account', key), now + reset)
+
+            business_usage = _load(headers.get('X-Business-Use-Case-Usage'))
+            if business_usage:
+                for business_id, entries in business_usage.items():
+                    if not isinstance(entries, list):
+                        continue
+
+                    entries = [entry for entry in entries if isinstance(entry, dict)]
+                    scope = ('business', business_id)
+
+                    self._remember(self._usage, scope, max(_percentage(entry) for entry in entries) if entries else 0)
+                    self._remember(self._businesses, key, self._businesses.get(key, frozenset()) | frozenset([scope]))
+
+                    regain = max(_number(entry.get('estimated_time_to_regain_access')) for entry in entries) if entries else 0
+                    if regain:
+                        self._remember(self._blocked_until, scope, now + regain * 60)
+
+    def _remember(self, values, key, value):
+        """
+        Store a value in one of the ordered dictionaries of the throttle, forgetting the least
+        recently stored values once it holds more than ``maxsize``.
+        """
+        values.pop(key, None)
+        values[key] = value
+
+        while len(values) > self.maxsize:
+            values.popitem(last=False)
+
+    def _get_usage(self, key, app):
+        """
+        Get the highest usage that applies to the given access token and the time until
+        which requests with it are blocked.
+        """
+        scopes = [app, ('token', key), ('ad_account', key)] + list(self._businesses.get(key, ()))
+
+        usage = max(self._usage.get(scope, 0) for scope in scopes)
+        blocked_until = max(self._blocked_until.get(scope, 0) for scope in scopes)
+
+        if usage < 100:
+            # Facebook only blocks requests once a rate limit has been exceeded.
+            blocked_until = 0
+
+        return usage, blocked_until
+
+    def _get_rate(self, usage):
+        """
+        Get the number of requests per second that may be made at the given usage.
+        """
+        if usage < self.threshold:
+            return self.rate
+
+        headroom = (100.0 - usage) / max(100.0 - self.threshold, 1)
+
+        return self.throttled_rate * max(headroom, 0.1)
+
+
+def _digest(token):
+    """
+    Identify an access token without keeping it in memory.
+    """
+    return hashlib.sha256((token or '').encode('utf-8')).hexdigest()[:16]
+
+
+def _get_app_scope(token, key, app_id=None):
+    """
+    Get the scope of the usage of the app the given access token belongs to. Facebook doesn't
+    say which app it reports usage for, so it's only known for app access tokens
+    ('<app id>|<app secret>') or if it's given; otherwise the scope is the access token's own.
+    """
+    if app_id is None and token and '|' in token:
+        app_id = token.split('|', 1)[0]
+
+    if app_id is not None:
+        return ('app', str(app_id))
+
+    return ('app', key)
+
+
+def _load(header):
+    """
+    Parse a usage header, which should be a JSON object, or return ``None`` if it isn't.
+    """
+    if not header:
+        return None
+
+    try:
+        usage = json.loads(header)
+    except ValueError:
+        return None
+
+    return usage if isinstance(usage, dict) else None
+
+
+def _number(value):
+    """
+    Get the given value of a usage header as a number, or 0 if it isn't one.
+    """
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return 0
+
+    return value
+
+
+def _percentage(usage):
+    return max(
+        _number(usage.get('call_count')),
+        _number(usage.get('total_time')),
+        _number(usage.get('total_cputime'))
+    )
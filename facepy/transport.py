@@ -0,0 +1,401 @@
+import os
+
+from collections import namedtuple
+
+import requests
+import six
+import urllib3
+
+from requests.adapters import HTTPAdapter
+from six.moves.http_cookiejar import CookieJar, DefaultCookiePolicy
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from facepy.exceptions import HTTPError
+
+TransportResponse = namedtuple('TransportResponse', ['status', 'headers', 'body', 'wire_size'])
+
+# The number of bytes received over the network is optional.
+TransportResponse.__new__.__defaults__ = (None,)
+
+# The number of bytes to read at a time from streamed responses.
+CHUNK_SIZE = 64 * 1024
+
+
+class Transport(object):
+    """
+    Base class for the transports :class:`facepy.GraphAPI` makes HTTP requests with.
+
+    Subclasses implement :meth:`send` to plug in another HTTP client, or a fake one for tests
+    and benchmarks::
+
+        class FakeTransport(Transport):
+
+            def send(self, method, url, **kwargs):
+                return TransportResponse(200, {}, b'{"id": "1"}')
+
+        graph = GraphAPI(access_token, transport=FakeTransport())
+
+    A transport may be shared by several instances and threads, so it must be thread-safe.
+    """
+
+    def send(self, method, url, params=None, data=None, files=None, headers=None, timeout=None, verify=True):
+        """
+        Make an HTTP request, returning a :class:`TransportResponse` of the status code,
+        headers and body of the response, and optionally the number of bytes that were
+        received over the network (which is smaller than the body if it was compressed).
+
+        Redirects are followed for GET and DELETE requests. Errors that prevent a response
+        from being received are raised as :class:`facepy.HTTPError`.
+
+        :param method: A string describing the HTTP method.
+        :param url: A string describing the URL, which may already have a query string.
+        :param params: A dictionary of parameters for the query string.
+        :param data: A dictionary of form data for the body.
+        :param files: A dictionary of file-like objects to upload with ``data``.
+        :param headers: A dictionary of HTTP request headers.
+        :param timeout: A number describing how many seconds to wait for the server, or ``None``.
+        :param verify: A boolean describing whether to verify SSL certificates.
+        """
+        raise NotImplementedError
+
+    def stream(self, method, url, params=None, headers=None, timeout=None, verify=True):
+        """
+        Make an HTTP request, returning a :class:`TransportResponse` whose body is an iterator
+        of byte strings that are read as it is consumed.
+
+        Transports that can't stream responses may read the whole body at once, which is what
+        this implementation does.
+
+        :param method: A string describing the HTTP method.
+        :param url: A string describing the URL, which may already have a query string.
+        :param params: A dictionary of parameters for the query string.
+        :param headers: A dictionary of HTTP request headers.
+        :param timeout: A number describing how many seconds to wait for the server, or ``None``.
+        :param verify: A boolean describing whether to verify SSL certificates.
+        """
+        response = self.send(method, url, params=params, headers=headers, timeout=timeout, verify=verify)
+
+        return TransportResponse(response.status, response.headers, iter([response.body]))
+
+    def close(self):
+        """
+        Close every connection.
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    A pool of connections to the Graph API made with ``requests``. This is the default transport.
+
+    It may be shared by many :class:`facepy.GraphAPI` instances and threads, regardless of
+    their access tokens::
+
+        transport = RequestsTransport(pool_maxsize=64)
+
+        graphs = dict(
+            (page_id, GraphAPI(token, transport=transport)) for page_id, token in page_tokens.items()
+        )
+
+    Cookies are not kept between requests, so responses to requests made with one access
+    token never affect requests made with another.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, session=None):
+        """
+        Initialize RequestsTransport.
+
+        :param pool_connections: An integer describing how many hosts to keep connection pools for.
+        :param pool_maxsize: An integer describing how many connections to keep open to each host.
+                             This should be at least the number of threads sharing the transport.
+        :param pool_block: A boolean describing whether requests should wait for a connection once
+                           ``pool_maxsize`` connections are in use, rather than open a connection
+                           that is discarded afterwards.
+        :param keep_alive: A boolean describing whether to reuse connections between requests.
+        :param session: An optional ``requests.Session`` to make requests with instead of creating
+                        one with the options above.
+        """
+        if session is None:
+            session = requests.session()
+
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+            # Include every encoding urllib3 can decode, such as brotli if it is installed.
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+            if not keep_alive:
+                session.headers['Connection'] = 'close'
+
+        self.session = session
+
+    def send(self, method, url, params=None, data=None, files=None, headers=None, timeout=None, verify=True):
+        options = {}
+
+        if headers:
+            options['headers'] = headers
+
+        try:
+            if method in ['GET', 'DELETE']:
+                response = self.session.request(
+                    method, url, params=params, allow_redirects=True,
+                    verify=verify, timeout=timeout, **options
+                )
+            else:
+                response = self.session.request(
+                    method, url, data=data, files=files or {},
+                    verify=verify, timeout=timeout, **options
+                )
+        except requests.RequestException as exception:
+            raise HTTPError(exception)
+
+        return TransportResponse(response.status_code, response.headers, response.content, _tell(response.raw))
+
+    def stream(self, method, url, params=None, headers=None, timeout=None, verify=True):
+        options = {}
+
+        if headers:
+            options['headers'] = headers
+
+        try:
+            response = self.session.request(
+                method, url, params=params, allow_redirects=True,
+                verify=verify, timeout=timeout, stream=True, **options
+            )
+        except requests.RequestException as exception:
+            raise HTTPError(exception)
+
+        def read():
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    yield chunk
+            except requests.RequestException as exception:
+                raise HTTPError(exception)
+            finally:
+                response.close()
+
+        return TransportResponse(response.status_code, response.headers, read())
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    A pool of connections made with ``urllib3`` directly, which skips the work ``requests``
+    does to prepare each request and response. Like :class:`RequestsTransport`, it may be
+    shared by many :class:`facepy.GraphAPI` instances and threads and does not keep cookies.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, verify=True,
+                 pool_manager=None):
+        """
+        Initialize Urllib3Transport.
+
+        :param pool_connections: An integer describing how many hosts to keep connection pools for.
+        :param pool_maxsize: An integer describing how many connections to keep open to each host.
+        :param pool_block: A boolean describing whether requests should wait for a connection once
+                           ``pool_maxsize`` connections are in use.
+        :param keep_alive: A boolean describing whether to reuse connections between requests.
+        :param verify: A boolean describing whether to verify SSL certificates.
+        :param pool_manager: An optional ``urllib3.PoolManager`` to make requests with instead of
+                             creating one with the options above.
+        """
+        if pool_manager is None:
+            pool_manager = urllib3.PoolManager(
+                num_pools=pool_connections,
+                maxsize=pool_maxsize,
+                block=pool_block,
+                cert_reqs='CERT_REQUIRED' if verify else 'CERT_NONE'
+            )
+
+        self.pool_manager = pool_manager
+        self.headers = urllib3.make_headers(accept_encoding=ACCEPT_ENCODING)
+
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def send(self, method, url, params=None, data=None, files=None, headers=None, timeout=None, verify=True):
+        """
+        Make an HTTP request. SSL certificates are verified as configured when the transport
+        was created, regardless of ``verify``.
+        """
+        headers = dict(self.headers, **(headers or {}))
+        body = None
+
+        if params:
+            url = '%s%s%s' % (url, '&' if '?' in url else '?', urlencode(params))
+
+        if files:
+            fields = dict(data or {})
+
+            for key, value in files.items():
+                fields[key] = (os.path.basename(getattr(value, 'name', None) or key), value.read())
+
+            body, headers['Content-Type'] = urllib3.encode_multipart_formdata(fields)
+        elif data:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        options = {}
+
+        if timeout is not None:
+            options['timeout'] = urllib3.Timeout(total=timeout)
+
+        try:
+            response = self.pool_manager.urlopen(
+                method, url, body=body, headers=headers,
+                redirect=method in ['GET', 'DELETE'], **options
+            )
+        except urllib3.exceptions.HTTPError as exception:
+            raise HTTPError(exception)
+
+        return TransportResponse(response.status, response.headers, response.data, _tell(response))
+
+    def stream(self, method, url, params=None, headers=None, timeout=None, verify=True):
+        headers = dict(self.headers, **(headers or {}))
+
+        if params:
+            url = '%s%s%s' % (url, '&' if '?' in url else '?', urlencode(params))
+
+        options = {}
+
+        if timeout is not None:
+            options['timeout'] = urllib3.Timeout(total=timeout)
+
+        try:
+            response = self.pool_manager.urlopen(
+                method, url, headers=headers, redirect=True, preload_content=False, **options
+            )
+        except urllib3.exceptions.HTTPError as exception:
+            raise HTTPError(exception)
+
+        def read():
+            try:
+                for chunk in response.stream(CHUNK_SIZE):
+                    yield chunk
+            except urllib3.exceptions.HTTPError as exception:
+                raise HTTPError(exception)
+            finally:
+                response.release_conn()
+
+        return TransportResponse(response.status, response.headers, read())
+
+    def close(self):
+        self.pool_manager.clear()
+
+
+class HTTP2Transport(Transport):
+    """
+    A transport that multiplexes concurrent requests over a few HTTP/2 connections with
+    `httpx <https://www.python-httpx.org/>`_, rather than using a connection per request
+    in flight. It may be shared by many :class:`facepy.GraphAPI` instances and threads::
+
+        graph = GraphAPI(access_token, http2=True)
+
+    Like :class:`RequestsTransport`, it does not keep cookies between requests. It requires
+    httpx with HTTP/2 support (``pip install httpx[http2]``).
+    """
+
+    def __init__(self, max_connections=10, keep_alive=True, verify=True, client=None):
+        """
+        Initialize HTTP2Transport.
+
+        :param max_connections: An integer describing how many connections may be open at once.
+        :param keep_alive: A boolean describing whether to reuse connections between requests.
+        :param verify: A boolean describing whether to verify SSL certificates.
+        :param client: An optional ``httpx.Client`` to make requests with instead of creating
+                       one with the options above.
+        """
+        if httpx is None:
+            raise ImportError('HTTP2Transport requires httpx; install it with "pip install httpx[http2]".')
+
+        if client is None:
+            client = httpx.Client(
+                http2=True,
+                verify=verify,
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections if keep_alive else 0
+                )
+            )
+
+        self.client = client
+
+    def send(self, method, url, params=None, data=None, files=None, headers=None, timeout=None, verify=True):
+        """
+        Make an HTTP request. SSL certificates are verified as configured when the client
+        was created, regardless of ``verify``.
+        """
+        try:
+            response = self.client.request(
+                method, _merge_params(url, params), data=data, files=files or None, headers=headers,
+                timeout=timeout, follow_redirects=method in ['GET', 'DELETE']
+            )
+        except httpx.HTTPError as exception:
+            raise HTTPError(exception)
+
+        return TransportResponse(
+            response.status_code, response.headers, response.content, response.num_bytes_downloaded
+        )
+
+    def stream(self, method, url, params=None, headers=None, timeout=None, verify=True):
+        try:
+            request = self.client.build_request(method, _merge_params(url, params), headers=headers, timeout=timeout)
+            response = self.client.send(request, stream=True, follow_redirects=True)
+        except httpx.HTTPError as exception:
+            raise HTTPError(exception)
+
+        def read():
+            try:
+                for chunk in response.iter_bytes(CHUNK_SIZE):
+                    yield chunk
+            except httpx.HTTPError as exception:
+                raise HTTPError(exception)
+            finally:
+                response.close()
+
+        return TransportResponse(response.status_code, response.headers, read())
+
+    def close(self):
+        self.client.close()
+
+
+def _merge_params(url, params):
+    """
+    Add the given parameters to the query string of the given URL for httpx, which replaces
+    the query string (such as the cursor of the next page) with ``params`` otherwise.
+    """
+    if not params:
+        return url
+
+    return httpx.URL(url).copy_merge_params(params)
+
+
+def _tell(response):
+    """
+    Get the number of bytes urllib3 received for the given response, if it can tell.
+    """
+    try:
+        size = response.tell()
+    except Exception:
+        return None
+
+    return size if isinstance(size, six.integer_types) else None
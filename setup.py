@@ -22,7 +22,14 @@ setup(
     install_requires=[
         'requests >= 0.8',
         'six >= 1.6',
+        'futures; python_version < "3"',
     ],
+    extras_require={
+        'brotli': ['brotli'],
+        'async': ['aiohttp >= 3.0; python_version >= "3.6"'],
+        'http2': ['httpx[http2]; python_version >= "3.6"'],
+        'orjson': ['orjson; python_version >= "3.6"'],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
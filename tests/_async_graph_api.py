@@ -0,0 +1,149 @@
+"""Tests for the ``async_graph_api`` module, which are only collected on Python 3.6 and later."""
+import asyncio
+import json
+import decimal
+
+from nose.tools import *
+from mock import MagicMock
+
+from facepy import AsyncGraphAPI, GraphAPI
+from facepy.retry import RetryPolicy
+
+
+class FakeResponse(object):
+
+    def __init__(self, content, status=200, headers=None):
+        self.content = content.encode('utf-8')
+        self.status = status
+        self.headers = headers or {}
+        self.content_length = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def read(self):
+        return self.content
+
+
+def fake_session(*responses):
+    session = MagicMock()
+    session.request.side_effect = list(responses)
+    return session
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_get():
+    session = fake_session(FakeResponse('{"id": 1, "payout": 0.94}'))
+    graph = AsyncGraphAPI('<access token>', session=session)
+
+    response = run(graph.get('me', fields=['id', 'payout']))
+
+    assert_equal(response, {'id': 1, 'payout': decimal.Decimal('0.94'), 'headers': {}})
+    session.request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/me',
+        params={
+            'access_token': '<access token>',
+            'fields': 'id,payout'
+        },
+        allow_redirects=True
+    )
+
+
+def test_forbidden_get():
+    graph = AsyncGraphAPI('<access token>', session=fake_session(FakeResponse('false')))
+
+    assert_raises(AsyncGraphAPI.FacebookError, run, graph.get('me'))
+
+
+def test_post():
+    session = fake_session(FakeResponse('{"id": 1}'))
+    graph = AsyncGraphAPI('<access token>', version='2.12', session=session)
+
+    run(graph.post('me/feed', message='Hi', privacy={'value': 'SELF'}))
+
+    session.request.assert_called_with(
+        'POST',
+        'https://graph.facebook.com/v2.12/me/feed',
+        data={
+            'message': 'Hi',
+            'privacy': '{"value": "SELF"}',
+            'access_token': '<access token>'
+        }
+    )
+
+
+def test_paged_get():
+    session = fake_session(
+        FakeResponse(json.dumps({'data': [1, 2], 'paging': {'next': 'https://graph.facebook.com/herc/posts?after=2'}})),
+        FakeResponse(json.dumps({'data': [3], 'paging': {}}))
+    )
+    graph = AsyncGraphAPI('<access token>', session=session)
+
+    async def collect():
+        return [page['data'] async for page in graph.get('herc/posts', page=True, offset=1)]
+
+    assert_equal(run(collect()), [[1, 2], [3]])
+    session.request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/herc/posts?after=2',
+        params={'access_token': '<access token>'},
+        allow_redirects=True
+    )
+
+
+def test_batch():
+    session = fake_session(FakeResponse(json.dumps([
+        {'code': 200, 'headers': [], 'body': '{"foo": "bar"}'},
+        {'code': 500, 'headers': [], 'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'}
+    ])))
+    graph = AsyncGraphAPI('<access token>', session=session)
+
+    requests = [
+        {'method': 'GET', 'relative_url': 'me'},
+        {'method': 'POST', 'relative_url': 'me/feed', 'body': {'message': 'Hi me.'}}
+    ]
+
+    async def collect():
+        return [response async for response in graph.batch(requests)]
+
+    responses = run(collect())
+
+    assert_equal(responses[0], {'foo': 'bar'})
+    assert isinstance(responses[1], AsyncGraphAPI.FacebookError)
+    assert_equal(responses[1].request, requests[1])
+    assert_equal(requests[1]['body'], 'message=Hi+me.')
+
+
+def test_retry():
+    error = json.dumps({'error': {'code': 1, 'message': 'An unknown error occurred'}})
+    session = fake_session(FakeResponse(error), FakeResponse(error), FakeResponse('{"id": 1}'))
+    graph = AsyncGraphAPI('<access token>', session=session, retry_policy=RetryPolicy(backoff=0))
+
+    assert_equal(run(graph.get('me', retry=2))['id'], 1)
+    assert_equal(session.request.call_count, 3)
+
+
+def test_error_on_facebook_500():
+    graph = AsyncGraphAPI('<access token>', session=fake_session(FakeResponse('', status=500)))
+
+    assert_raises(AsyncGraphAPI.FacebookError, run, graph.get('me', retry=0))
+
+
+def test_unsupported_methods():
+    graph = AsyncGraphAPI('<access token>', session=fake_session())
+
+    assert not isinstance(graph, GraphAPI)
+
+    for name in ['iter_items', 'autobatch', 'fetch_nested_pages', 'transport', 'etags', 'throttle']:
+        assert not hasattr(graph, name), name
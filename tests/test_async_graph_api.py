@@ -0,0 +1,9 @@
+"""Tests for the ``async_graph_api`` module."""
+import sys
+
+from nose.plugins.skip import SkipTest
+
+if sys.version_info < (3, 6):
+    raise SkipTest('AsyncGraphAPI requires Python 3.6 or later.')
+
+from tests._async_graph_api import *
@@ -0,0 +1,64 @@
+"""Tests for the ``cache`` module."""
+
+from mock import patch
+from nose.tools import assert_equal
+
+from facepy.cache import MemoryCache
+
+
+def test_get_and_set():
+    cache = MemoryCache()
+
+    assert_equal(cache.get('https://graph.facebook.com/me?'), None)
+
+    cache.set('https://graph.facebook.com/me?', {'id': 1})
+
+    assert_equal(cache.get('https://graph.facebook.com/me?'), {'id': 1})
+    assert_equal((cache.hits, cache.misses), (1, 1))
+
+
+def test_least_recently_used_values_are_evicted():
+    cache = MemoryCache(maxsize=2)
+
+    cache.set('a?', 1)
+    cache.set('b?', 2)
+    cache.get('a?')
+    cache.set('c?', 3)
+
+    assert_equal(cache.get('a?'), 1)
+    assert_equal(cache.get('b?'), None)
+    assert_equal(cache.get('c?'), 3)
+    assert_equal(len(cache), 2)
+
+
+@patch('facepy.cache._clock')
+def test_values_expire(clock):
+    cache = MemoryCache(ttl=60)
+
+    clock.return_value = 0
+    cache.set('a?', 1)
+    cache.set('b?', 2, ttl=120)
+
+    clock.return_value = 90
+    assert_equal(cache.get('a?'), None)
+    assert_equal(cache.get('b?'), 2)
+
+    cache = MemoryCache(ttl=None)
+    cache.set('c?', 3)
+
+    clock.return_value = 10 ** 6
+    assert_equal(cache.get('c?'), 3)
+
+
+def test_invalidate():
+    cache = MemoryCache()
+
+    cache.set('https://graph.facebook.com/me?fields=id', 1)
+    cache.set('https://graph.facebook.com/me?fields=name', 2)
+    cache.set('https://graph.facebook.com/me/feed?', 3)
+
+    cache.invalidate('https://graph.facebook.com/me')
+
+    assert_equal(cache.get('https://graph.facebook.com/me?fields=id'), None)
+    assert_equal(cache.get('https://graph.facebook.com/me?fields=name'), None)
+    assert_equal(cache.get('https://graph.facebook.com/me/feed?'), 3)
@@ -0,0 +1,90 @@
+# -*- coding:utf-8 -*-
+
+"""Tests for the ``decoding`` module."""
+import decimal
+
+from nose.tools import assert_equal, assert_raises
+
+from facepy.decoding import FLOAT_MODES, iter_data, loads
+
+PAYLOAD = b'{"data": [{"id": "1", "value": 0.94, "count": 3, "name": "Herc \\u00e6"}]}'
+
+
+def test_decimal():
+    result = loads(PAYLOAD)
+
+    assert_equal(result['data'][0]['value'], decimal.Decimal('0.94'))
+    assert isinstance(result['data'][0]['value'], decimal.Decimal)
+    assert_equal(result['data'][0]['name'], u'Herc æ')
+
+
+def test_float():
+    result = loads(PAYLOAD, 'float')
+
+    assert_equal(result['data'][0]['value'], 0.94)
+    assert isinstance(result['data'][0]['value'], float)
+    assert_equal(result['data'][0]['count'], 3)
+    assert_equal(result['data'][0]['name'], u'Herc æ')
+
+
+def test_strings():
+    for float_mode in FLOAT_MODES:
+        assert_equal(loads(PAYLOAD.decode('utf-8'), float_mode)['data'][0]['count'], 3)
+
+
+def test_invalid_json():
+    for float_mode in FLOAT_MODES:
+        assert_raises(ValueError, loads, b'<html></html>', float_mode)
+        assert_raises(ValueError, loads, b'\xff', float_mode)
+
+
+def test_unsupported_float_mode():
+    assert_raises(ValueError, loads, b'{}', 'double')
+
+
+def test_iter_data():
+    content = b'{"data": [{"id": "1", "value": 0.94}, 2, "three"], "paging": {"next": "https://graph.facebook.com/?after=3"}}'
+
+    for size in (1, 5, len(content)):
+        rest = {}
+        items = iter_data([content[i:i + size] for i in range(0, len(content), size)], rest)
+
+        assert_equal(next(items), {'id': '1', 'value': decimal.Decimal('0.94')})
+        assert_equal(list(items), [2, 'three'])
+        assert_equal(rest, {'paging': {'next': 'https://graph.facebook.com/?after=3'}})
+
+
+def test_iter_data_split_at_every_offset():
+    content = b'{"data": [0.1, -12.5e-3, 1E+2, 10, true, null, "x"], "p": 1}'
+
+    for float_mode in FLOAT_MODES:
+        expected = list(iter_data([content], {}, float_mode))
+
+        assert_equal(expected, [0.1, -12.5e-3, 1E+2, 10, True, None, 'x'] if float_mode == 'float' else [
+            decimal.Decimal('0.1'), decimal.Decimal('-12.5e-3'), decimal.Decimal('1E+2'), 10, True, None, 'x'
+        ])
+
+        for offset in range(len(content) + 1):
+            rest = {}
+
+            assert_equal(list(iter_data([content[:offset], content[offset:]], rest, float_mode)), expected)
+            assert_equal(rest, {'p': 1})
+
+        for size in (1, 2, 3, 4, 6, 12):
+            rest = {}
+            chunks = [content[i:i + size] for i in range(0, len(content), size)]
+
+            assert_equal(list(iter_data(chunks, rest, float_mode)), expected)
+            assert_equal(rest, {'p': 1})
+
+
+def test_iter_data_without_data():
+    rest = {}
+
+    assert_equal(list(iter_data([b' { "data": [ ], "summary": {"total_count": 12', b'3} } '], rest)), [])
+    assert_equal(rest, {'summary': {'total_count': 123}})
+
+
+def test_iter_data_with_invalid_json():
+    for content in [b'false', b'[1, 2]', b'{"data": [1, 2', b'{"data": [1 2]}']:
+        assert_raises(ValueError, list, iter_data([content], {}))
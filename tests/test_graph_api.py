@@ -3,14 +3,19 @@
 """Tests for the ``graph_api`` module."""
 import json
 import decimal
+import threading
+import time
 
 from nose.tools import *
 from mock import patch, MagicMock
 from requests.exceptions import ConnectionError
 
 from facepy import GraphAPI
+from facepy.graph_api import _read_ahead, find_paging
+from facepy.transport import TransportResponse
 
 
+sleep_patch = patch('facepy.graph_api.sleep')
 patch = patch('requests.session')
 
 
@@ -18,10 +23,32 @@ def mock():
     global mock_request
 
     mock_request = patch.start()().request
+    sleep_patch.start()
 
 
 def unmock():
     patch.stop()
+    sleep_patch.stop()
+
+
+def batch_side_effect(respond):
+    """
+    Mock the response to a batch request, answering each request in it with ``respond(request)``.
+
+    Like Facebook, batches of more than 50 requests are rejected.
+    """
+    def side_effect(*args, **kwargs):
+        batch = json.loads(kwargs['data']['batch'])
+        if len(batch) > 50:
+            return MagicMock(content='{"error":{"message":"Too many requests in batch message. Maximum batch size is 50","type":"GraphBatchException"}}',
+                             status_code=200)
+        return MagicMock(content=json.dumps([respond(request) for request in batch]), status_code=200)
+
+    return side_effect
+
+
+def echo_url(request):
+    return {'code': 200, 'headers': [], 'body': json.dumps({'url': request['relative_url']})}
 
 
 @with_setup(mock, unmock)
@@ -81,6 +108,32 @@ def test_get_with_nested_parameters():
     )
 
 
+@with_setup(mock, unmock)
+def test_get_with_translated_parameter_names():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({
+        'id': 1
+    })
+    mock_request.return_value.status_code = 200
+
+    graph.get('me', og__title='Herc', ids_sqbro_0_sqbrc_=['1', '2'], filtering=[1, 2])
+
+    mock_request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/me',
+        allow_redirects=True,
+        verify=True,
+        timeout=None,
+        params={
+            'access_token': '<access token>',
+            'og:title': 'Herc',
+            'ids[0]': '1,2',
+            'filtering': '[1, 2]'
+        }
+    )
+
+
 @with_setup(mock, unmock)
 def test_get_with_appsecret():
     graph = GraphAPI('<access token>', appsecret='<appsecret>')
@@ -110,6 +163,30 @@ def test_get_with_appsecret():
     )
 
 
+@with_setup(mock, unmock)
+def test_appsecret_proof_is_cached():
+    graph = GraphAPI('<access token>', appsecret='<appsecret>')
+    proof = graph._generate_appsecret_proof()
+
+    mock_request.return_value.content = json.dumps({'id': 1})
+    mock_request.return_value.status_code = 200
+
+    graph._generate_appsecret_proof = MagicMock(side_effect=graph._generate_appsecret_proof)
+
+    graph.get('me')
+    graph.get('me')
+
+    assert_equal(mock_request.call_args[1]['params']['appsecret_proof'], proof)
+    assert_equal(graph._generate_appsecret_proof.call_count, 1)
+
+    # Reassigning the access token invalidates it.
+    graph.oauth_token = '<another access token>'
+    graph.get('me')
+
+    assert_equal(graph._generate_appsecret_proof.call_count, 2)
+    assert mock_request.call_args[1]['params']['appsecret_proof'] != proof
+
+
 @with_setup(mock, unmock)
 def test_get_with_new_version():
     graph = GraphAPI('<access token>', version='2.0')
@@ -138,6 +215,22 @@ def test_get_with_new_version():
     )
 
 
+def test_get_url_follows_changes_to_version_and_url():
+    graph = GraphAPI('<access token>', version='2.0')
+
+    assert_equal(graph._get_url('/me'), 'https://graph.facebook.com/v2.0/me')
+
+    graph.version = '2.12'
+
+    assert_equal(graph._get_url('/me'), 'https://graph.facebook.com/v2.12/me')
+
+    graph.url = 'https://graph-video.facebook.com'
+    graph.version = None
+
+    assert_equal(graph._get_url('/me'), 'https://graph-video.facebook.com/me')
+    assert_equal(graph._get_url('//graph.facebook.com/me'), '//graph.facebook.com/me')
+
+
 @with_setup(mock, unmock)
 def test_get_with_fields():
     graph = GraphAPI('<access token>')
@@ -190,6 +283,67 @@ def test_get_with_fpnum():
     assert_equal(resp, {'payout': decimal.Decimal('0.94'), 'headers': {}})
 
 
+@with_setup(mock, unmock)
+def test_get_with_float_mode():
+    mock_request.return_value.content = b'{"payout": 0.94}'
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {}
+
+    graph = GraphAPI('<access token>', float_mode='float')
+
+    resp = graph.get('<paymend_id>')
+
+    assert_equal(resp, {'payout': 0.94, 'headers': {}})
+    assert isinstance(resp['payout'], float)
+
+    assert_raises(ValueError, GraphAPI, '<access token>', float_mode='double')
+
+
+@with_setup(mock, unmock)
+def test_get_raw():
+    graph = GraphAPI('<access token>', etags=True)
+
+    mock_request.return_value.content = b'{"id": 1, "payout": 0.94}'
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {'ETag': '"abc"'}
+
+    response = graph.get('me', raw=True)
+
+    assert_equal(response.status, 200)
+    assert_equal(response.headers, {'ETag': '"abc"'})
+    assert_equal(response.body, b'{"id": 1, "payout": 0.94}')
+
+    graph.get('me', raw=True)
+
+    assert 'headers' not in mock_request.call_args[1]
+
+    mock_request.return_value.content = b'false'
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', raw=True)
+    assert_raises(ValueError, graph.get, 'me', page=True, raw=True)
+
+
+@with_setup(mock, unmock)
+def test_get_raw_with_errors():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({
+        'error': {
+            'code': 190,
+            'message': 'Error validating access token',
+            'type': 'OAuthException'
+        }
+    }).encode('utf-8')
+    mock_request.return_value.status_code = 400
+
+    assert_raises(GraphAPI.OAuthError, graph.get, 'me', raw=True)
+
+    mock_request.return_value.content = b' {"error_code": 1, "error_msg": "An unknown error occurred"}'
+    mock_request.return_value.status_code = 200
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', raw=True, retry=0)
+
+
 @with_setup(mock, unmock)
 def test_forbidden_get():
     graph = GraphAPI('<access token>')
@@ -254,6 +408,7 @@ def test_paged_get():
 
     assert_equal(index, 2)
 
+
 @with_setup(mock, unmock)
 def test_pagination_with_nested_paging_next():
     graph = GraphAPI('<access token>')
@@ -303,6 +458,129 @@ def test_pagination_with_nested_paging_next():
 
     assert_equal(index, 2)
 
+
+@with_setup(mock, unmock)
+def test_pagination_with_paging_path():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {
+            'posts': {
+                'paging': {
+                    'next': 'https://graph.facebook.com/herc/posts?after=1'
+                }
+            },
+            'photos': {
+                'paging': {
+                    'next': 'https://graph.facebook.com/herc/photos?after=1'
+                }
+            }
+        },
+        {
+            'photos': {
+                'paging': {}
+            }
+        }
+    ]
+
+    def side_effect(*args, **kwargs):
+        return MagicMock(content=json.dumps(responses.pop(0)), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    pages = list(graph.get('herc?fields=posts,photos', page=True, paging_path=('photos', 'paging')))
+
+    assert_equal(len(pages), 2)
+    assert_equal(mock_request.call_args[0][1], 'https://graph.facebook.com/herc/photos?after=1')
+
+
+@with_setup(mock, unmock)
+def test_fetch_nested_pages():
+    graph = GraphAPI('<access token>')
+
+    result = {
+        'data': [
+            {
+                'id': '1',
+                'comments': {
+                    'data': [{'id': '1_1'}],
+                    'paging': {'next': 'https://graph.facebook.com/1/comments?after=1'}
+                }
+            },
+            {
+                'id': '2',
+                'comments': {
+                    'data': [{'id': '2_1'}],
+                    'paging': {}
+                }
+            }
+        ],
+        'paging': {'next': 'https://graph.facebook.com/me/posts?after=2'},
+        'likes': {
+            'data': [{'id': '3'}],
+            'paging': {'next': 'https://graph.facebook.com/me/likes?after=3'}
+        }
+    }
+
+    responses = {
+        'https://graph.facebook.com/1/comments?after=1': {
+            'data': [{'id': '1_2'}],
+            'paging': {'next': 'https://graph.facebook.com/1/comments?after=2'}
+        },
+        'https://graph.facebook.com/1/comments?after=2': {
+            'data': [{'id': '1_3'}],
+            'paging': {'cursors': {'after': '3'}}
+        },
+        'https://graph.facebook.com/me/likes?after=3': {
+            'data': [
+                {
+                    'id': '4',
+                    'comments': {
+                        'data': [{'id': '4_1'}],
+                        'paging': {'next': 'https://graph.facebook.com/4/comments?after=1'}
+                    }
+                }
+            ]
+        },
+        'https://graph.facebook.com/4/comments?after=1': {
+            'data': [{'id': '4_2'}]
+        }
+    }
+
+    def side_effect(method, url, **kwargs):
+        assert_equal(kwargs['params'], {'access_token': '<access token>'})
+
+        return MagicMock(content=json.dumps(responses.pop(url)), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    assert_true(graph.fetch_nested_pages(result) is result)
+
+    assert_equal(responses, {})
+    assert_equal([comment['id'] for comment in result['data'][0]['comments']['data']], ['1_1', '1_2', '1_3'])
+    assert_equal(result['data'][0]['comments']['paging'], {'cursors': {'after': '3'}})
+    assert_equal([like['id'] for like in result['likes']['data']], ['3', '4'])
+    assert_equal([comment['id'] for comment in result['likes']['data'][1]['comments']['data']], ['4_1', '4_2'])
+
+    # The next page of the result itself is left to the caller.
+    assert_equal(result['paging'], {'next': 'https://graph.facebook.com/me/posts?after=2'})
+
+
+def test_find_paging():
+    paging = {'next': 'https://graph.facebook.com/herc/posts?after=1'}
+
+    assert_equal(find_paging({'data': [], 'paging': paging}), paging)
+    assert_equal(find_paging({'posts': {'data': [], 'paging': paging}}), paging)
+
+    # Shallower paging is found first, regardless of the order of the keys.
+    assert_equal(find_paging({'a': {'b': {'paging': {}}}, 'c': {'paging': paging}}), paging)
+
+    # Paging is only looked for a few levels down.
+    assert_equal(find_paging({'a': {'b': {'c': {'d': {'paging': paging}}}}}), None)
+    assert_equal(find_paging({'a': {'b': {'c': {'d': {'paging': paging}}}}}, max_depth=4), paging)
+    assert_equal(find_paging({'id': '1', 'name': 'Herc'}), None)
+
+
 @with_setup(mock, unmock)
 def test_pagination_without_paging_next():
     graph = GraphAPI('<access token>')
@@ -622,27 +900,111 @@ def test_batch_error_references_request():
     assert_equal(responses[0].request, requests[0])
 
 
+@with_setup(mock, unmock)
+def test_lazy_batch():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps([
+        {
+            'code': 200,
+            'headers': [
+                {'name': 'Content-Type', 'value': 'text/javascript; charset=UTF-8'}
+            ],
+            'body': '{"foo": "bar"}'
+        },
+        {
+            'code': 400,
+            'headers': [],
+            'body': '{"error": {"type": "OAuthException", "code": 190, "message": "Error validating access token"}}'
+        },
+        None
+    ])
+    mock_request.return_value.status_code = 200
+
+    requests = [
+        {'method': 'GET', 'relative_url': 'me/friends'},
+        {'method': 'GET', 'relative_url': 'me'},
+        {'method': 'GET', 'relative_url': 'me/photos'}
+    ]
+
+    parse = graph._parse = MagicMock(wraps=graph._parse)
+
+    responses = list(graph.batch(requests, lazy=True))
+
+    assert_equal(parse.call_count, 1)
+
+    assert_equal(responses[0].code, 200)
+    assert_equal(responses[0].headers, {'Content-Type': 'text/javascript; charset=UTF-8'})
+    assert_equal(responses[1].code, 400)
+    assert_equal(responses[2], None)
+    assert_equal(parse.call_count, 1)
+
+    assert_equal(responses[0].data, {'foo': 'bar'})
+    assert_equal(responses[0].data, {'foo': 'bar'})
+    assert_equal(parse.call_count, 2)
+
+    assert_raises(GraphAPI.OAuthError, getattr, responses[1], 'data')
+
+    try:
+        responses[1].data
+    except GraphAPI.OAuthError as exception:
+        assert_equal(exception.request, requests[1])
+
+
+@with_setup(mock, unmock)
+def test_raw_batch():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps([
+        {
+            'code': 200,
+            'headers': [
+                {'name': 'Content-Type', 'value': 'text/javascript; charset=UTF-8'}
+            ],
+            'body': '{"foo": "bar"}'
+        },
+        {
+            'code': 500,
+            'headers': [],
+            'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'
+        },
+        {
+            'code': 200,
+            'headers': [],
+            'body': '{"error_count": 0}'
+        }
+    ])
+    mock_request.return_value.status_code = 200
+
+    requests = [
+        {'method': 'GET', 'relative_url': 'me/friends'},
+        {'method': 'GET', 'relative_url': 'me'},
+        {'method': 'GET', 'relative_url': 'me/stats'}
+    ]
+
+    responses = list(graph.batch(requests, raw=True))
+
+    assert_equal(responses[0].status, 200)
+    assert_equal(responses[0].headers, {'Content-Type': 'text/javascript; charset=UTF-8'})
+    assert_equal(responses[0].body, b'{"foo": "bar"}')
+    assert isinstance(responses[1], GraphAPI.FacebookError)
+    assert_equal(responses[1].request, requests[1])
+
+    # Bodies that only look like errors are returned as they are, too.
+    assert_equal(responses[2], TransportResponse(200, {}, b'{"error_count": 0}'))
+
+
 @with_setup(mock, unmock)
 def test_batch_over_50_requests():
     graph = GraphAPI('<access_token')
 
-    def side_effect_batch_size(*args, **kwargs):
-        batch_size = len(json.loads(kwargs['data']['batch']))
-        if batch_size > 50:
-            return MagicMock(content='{"error":{"message":"Too many requests in batch message. Maximum batch size is 50","type":"GraphBatchException"}}',
-                             status_code=200)
-        else:
-            return MagicMock(content=json.dumps([
-                {
-                    'code': 200,
-                    'headers': [
-                        {'name': 'Content-Type', 'value': 'text/javascript; charset=UTF-8'}
-                    ],
-                    'body': '{"foo": "bar"}'
-                } for i in range(batch_size)
-            ]), status_code=200)
-
-    mock_request.side_effect = side_effect_batch_size
+    mock_request.side_effect = batch_side_effect(lambda request: {
+        'code': 200,
+        'headers': [
+            {'name': 'Content-Type', 'value': 'text/javascript; charset=UTF-8'}
+        ],
+        'body': '{"foo": "bar"}'
+    })
 
     requests = [dict(method="GET", relative_url="me?fields=username") for i in range(60)]
 
@@ -763,3 +1125,598 @@ def test_timeouts():
             'access_token': '<access token>'
         }
     )
+
+
+@with_setup(mock, unmock)
+def test_batch_with_concurrency():
+    graph = GraphAPI('<access token>')
+
+    mock_request.side_effect = batch_side_effect(echo_url)
+
+    requests = [dict(method='GET', relative_url='%s' % i) for i in range(160)]
+
+    responses = list(graph.batch(requests, max_concurrency=4))
+
+    assert_equal(len(mock_request.call_args_list), 4)
+    assert_equal([response['url'] for response in responses], [str(i) for i in range(160)])
+
+
+@with_setup(mock, unmock)
+def test_batch_streams_generators():
+    graph = GraphAPI('<access token>')
+
+    mock_request.side_effect = batch_side_effect(lambda request: {'code': 200, 'headers': [], 'body': '{"foo": "bar"}'})
+
+    requests = (dict(method='GET', relative_url='me') for i in range(1000))
+
+    batch = graph.batch(requests)
+
+    assert_equal(next(batch), {'foo': 'bar'})
+    assert_equal(len(mock_request.call_args_list), 1)
+
+    assert_equal(len(list(batch)), 999)
+    assert_equal(len(mock_request.call_args_list), 20)
+
+
+@with_setup(mock, unmock)
+def test_paged_get_with_prefetch():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {'data': [1], 'paging': {'next': 'https://graph.facebook.com/herc/posts?after=1'}},
+        {'data': [2], 'paging': {'next': 'https://graph.facebook.com/herc/posts?after=2'}},
+        {'data': [3], 'paging': {}}
+    ]
+
+    def side_effect(*args, **kwargs):
+        return MagicMock(content=json.dumps(responses.pop(0)), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    pages = graph.get('herc/posts', page=True, prefetch=1)
+
+    assert_equal(next(pages)['data'], [1])
+
+    # The next page is fetched while the first is being processed, but no more than that.
+    for i in range(100):
+        if len(mock_request.call_args_list) == 2:
+            break
+        time.sleep(0.01)
+
+    time.sleep(0.05)
+
+    assert_equal(len(mock_request.call_args_list), 2)
+    assert_equal([page['data'] for page in pages], [[2], [3]])
+    assert_equal(len(mock_request.call_args_list), 3)
+
+
+@with_setup(mock, unmock)
+def test_paged_get_with_prefetch_raises_errors():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {'data': [1], 'paging': {'next': 'https://graph.facebook.com/herc/posts?after=1'}},
+        {'error': {'code': 100, 'message': 'Invalid parameter'}}
+    ]
+
+    def side_effect(*args, **kwargs):
+        return MagicMock(content=json.dumps(responses.pop(0)), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    pages = graph.get('herc/posts', page=True, retry=0, prefetch=2)
+
+    assert_equal(next(pages)['data'], [1])
+    assert_raises(GraphAPI.FacebookError, next, pages)
+
+
+def test_read_ahead_raises_base_exceptions():
+    class Interrupt(BaseException):
+        pass
+
+    def pages():
+        yield 1
+        raise Interrupt()
+
+    pages = _read_ahead(pages(), 2)
+
+    assert_equal(next(pages), 1)
+    assert_raises(Interrupt, next, pages)
+
+
+@with_setup(mock, unmock)
+def test_iter_items():
+    graph = GraphAPI('<access token>')
+
+    pages = {
+        'https://graph.facebook.com/herc/posts': {
+            'data': [1, 2],
+            'paging': {'next': 'https://graph.facebook.com/herc/posts?access_token=<access token>&after=2'}
+        },
+        'https://graph.facebook.com/herc/posts?access_token=<access token>&after=2': {
+            'data': [3, 4],
+            'paging': {'next': 'https://graph.facebook.com/herc/posts?access_token=<access token>&after=4'}
+        },
+        'https://graph.facebook.com/herc/posts?access_token=<access token>&after=4': {
+            'data': [5],
+            'paging': {}
+        }
+    }
+
+    def side_effect(method, url, **kwargs):
+        return MagicMock(content=json.dumps(pages[url]), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    items = graph.iter_items('herc/posts', limit=2)
+
+    assert_equal(items.checkpoint, {'url': None, 'offset': 0, 'done': False})
+    assert_equal([next(items), next(items), next(items)], [1, 2, 3])
+
+    checkpoint = json.loads(json.dumps(items.checkpoint))
+    assert_equal(checkpoint, {'url': 'https://graph.facebook.com/herc/posts?after=2', 'offset': 1, 'done': False})
+    assert_equal(items.cursor, '2')
+
+    assert_equal(list(items), [4, 5])
+    assert_equal(items.checkpoint['done'], True)
+    assert_equal(len(mock_request.call_args_list), 3)
+
+    # Resume from the checkpoint without fetching the first page again.
+    pages['https://graph.facebook.com/herc/posts?after=2'] = pages.pop('https://graph.facebook.com/herc/posts?access_token=<access token>&after=2')
+    mock_request.reset_mock()
+
+    assert_equal(list(graph.iter_items('herc/posts', checkpoint=checkpoint, limit=2)), [4, 5])
+    assert_equal(len(mock_request.call_args_list), 2)
+    assert_equal(mock_request.call_args_list[0][0][1], 'https://graph.facebook.com/herc/posts?after=2')
+
+
+@with_setup(mock, unmock)
+def test_iter_items_checkpoint_at_page_boundary():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({
+        'data': [1],
+        'paging': {'next': 'https://graph.facebook.com/herc/posts?after=1'}
+    })
+    mock_request.return_value.status_code = 200
+
+    items = graph.iter_items('herc/posts')
+    next(items)
+
+    assert_equal(items.checkpoint, {'url': 'https://graph.facebook.com/herc/posts?after=1', 'offset': 0, 'done': False})
+
+
+@with_setup(mock, unmock)
+def test_iter_items_stream():
+    graph = GraphAPI('<access token>')
+
+    pages = [
+        b'{"data": [{"id": "1", "payout": 0.94}, {"id": "2"}], "paging": {"next": "https://graph.facebook.com/herc/posts?after=2"}}',
+        b'{"paging": {}, "data": [{"id": "3"}]}'
+    ]
+
+    def side_effect(*args, **kwargs):
+        body = pages.pop(0)
+        chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+        return MagicMock(status_code=200, headers={}, iter_content=lambda size: iter(chunks))
+
+    mock_request.side_effect = side_effect
+
+    items = graph.iter_items('herc/posts', stream=True, limit=2)
+
+    assert_equal(next(items), {'id': '1', 'payout': decimal.Decimal('0.94')})
+    assert_equal(items.checkpoint, {'url': None, 'offset': 1, 'done': False})
+    assert_equal(mock_request.call_args[1]['stream'], True)
+
+    assert_equal(next(items), {'id': '2'})
+    assert_equal(next(items), {'id': '3'})
+    assert_equal(list(items), [])
+    assert_equal(items.checkpoint, {'url': None, 'offset': 0, 'done': True})
+    assert_equal(mock_request.call_args[0][1], 'https://graph.facebook.com/herc/posts?after=2')
+
+    # The size of streamed responses on the wire is unknown, so they count as uncompressed.
+    assert_equal(graph.stats['bytes_received'], 158)
+    assert_equal(graph.stats['bytes_decompressed'], 158)
+
+
+@with_setup(mock, unmock)
+def test_iter_items_stream_with_errors():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value = MagicMock(
+        status_code=400,
+        headers={},
+        iter_content=lambda size: iter([b'{"error": {"code": 100, "message": "Invalid parameter"}}'])
+    )
+
+    assert_raises(GraphAPI.FacebookError, list, graph.iter_items('herc/posts', stream=True, retry=0))
+
+    mock_request.return_value = MagicMock(status_code=200, headers={}, iter_content=lambda size: iter([b'false']))
+
+    assert_raises(GraphAPI.FacebookError, list, graph.iter_items('herc/posts', stream=True, retry=0))
+
+
+@with_setup(mock, unmock)
+def test_get_with_cache():
+    from facepy.cache import MemoryCache
+
+    cache = MemoryCache()
+    graph = GraphAPI('<access token>', cache=cache, cache_ttl={'*/insights': 0})
+
+    mock_request.return_value.content = json.dumps({'id': 1})
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {}
+
+    assert_equal(graph.get('me', fields=['id']), {'id': 1, 'headers': {}})
+    graph.get('me', fields=['id'])['id'] = 2
+    assert_equal(graph.get('me', fields=['id']), {'id': 1, 'headers': {}})
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal((cache.hits, cache.misses), (2, 1))
+
+    # Other tokens don't share cached responses.
+    GraphAPI('<another access token>', cache=cache).get('me', fields=['id'])
+    assert_equal(len(mock_request.call_args_list), 2)
+
+    # Paths may be excluded from the cache.
+    graph.get('1/insights')
+    graph.get('1/insights')
+    assert_equal(len(mock_request.call_args_list), 4)
+
+    # Posting to a path invalidates it.
+    graph.post('me', name='Herc')
+    graph.get('me', fields=['id'])
+    assert_equal(len(mock_request.call_args_list), 6)
+
+
+@with_setup(mock, unmock)
+def test_get_with_etags():
+    graph = GraphAPI('<access token>', etags=True)
+
+    mock_request.return_value.content = json.dumps({'id': 1})
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {'ETag': '"abc"'}
+
+    assert_equal(graph.get('me'), {'id': 1, 'headers': {'ETag': '"abc"'}})
+
+    mock_request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/me',
+        allow_redirects=True,
+        verify=True,
+        timeout=None,
+        params={
+            'access_token': '<access token>'
+        }
+    )
+
+    mock_request.return_value.content = ''
+    mock_request.return_value.status_code = 304
+    mock_request.return_value.headers = {'ETag': '"abc"', 'X-App-Usage': '{}'}
+
+    assert_equal(graph.get('me'), {'id': 1, 'headers': {'ETag': '"abc"', 'X-App-Usage': '{}'}})
+
+    mock_request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/me',
+        allow_redirects=True,
+        verify=True,
+        timeout=None,
+        headers={'If-None-Match': '"abc"'},
+        params={
+            'access_token': '<access token>'
+        }
+    )
+
+
+@with_setup(mock, unmock)
+def test_get_with_etags_returns_copies():
+    graph = GraphAPI('<access token>', etags=True)
+
+    mock_request.return_value.content = json.dumps({'data': [1, 2]})
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {'ETag': '"abc"'}
+
+    graph.get('me/friends')['data'][1] = 'MUTATED'
+
+    mock_request.return_value.content = ''
+    mock_request.return_value.status_code = 304
+
+    result = graph.get('me/friends')
+    result['data'].append('MUTATED')
+
+    assert_equal(graph.get('me/friends')['data'], [1, 2])
+
+
+@with_setup(mock, unmock)
+def test_get_with_coalescing():
+    graph = GraphAPI('<access token>', coalesce=True)
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def side_effect(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return MagicMock(content=json.dumps({'id': 1}), status_code=200, headers={})
+
+    mock_request.side_effect = side_effect
+
+    results = []
+
+    def get():
+        results.append(graph.get('me', fields=['id']))
+
+    threads = [threading.Thread(target=get) for i in range(5)]
+
+    threads[0].start()
+    started.wait(5)
+
+    for thread in threads[1:]:
+        thread.start()
+
+    # Give the other threads a moment to join the request in flight.
+    time.sleep(0.1)
+
+    release.set()
+
+    for thread in threads:
+        thread.join(5)
+
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal(results, [{'id': 1, 'headers': {}}] * 5)
+
+    graph.get('me', fields=['id'])
+
+    assert_equal(len(mock_request.call_args_list), 2)
+
+
+@with_setup(mock, unmock)
+def test_get_with_coalescing_shares_base_exceptions():
+    graph = GraphAPI('<access token>', coalesce=True)
+
+    class Interrupt(BaseException):
+        pass
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def side_effect(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        raise Interrupt()
+
+    mock_request.side_effect = side_effect
+
+    errors = []
+
+    def get():
+        try:
+            graph.get('me')
+        except BaseException as exception:
+            errors.append(exception)
+
+    threads = [threading.Thread(target=get) for i in range(2)]
+
+    for thread in threads:
+        thread.daemon = True
+
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+
+    # Give the other thread a moment to join the request in flight.
+    time.sleep(0.1)
+
+    release.set()
+
+    for thread in threads:
+        thread.join(5)
+
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal([type(error) for error in errors], [Interrupt, Interrupt])
+
+
+@with_setup(mock, unmock)
+def test_autobatch():
+    graph = GraphAPI('<access token>', version='2.12')
+
+    def respond(request):
+        if request['relative_url'] == 'forbidden':
+            return {'code': 400, 'headers': [], 'body': '{"error": {"code": 100, "message": "Unsupported get request"}}'}
+        return echo_url(request)
+
+    mock_request.side_effect = batch_side_effect(respond)
+
+    with graph.autobatch(window=1) as batcher:
+        me = batcher.get('me', fields=['id', 'name'])
+        herc = batcher.get('herc')
+        forbidden = batcher.get('forbidden')
+
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal(mock_request.call_args[0][1], 'https://graph.facebook.com/v2.12/')
+    assert_equal(me.result(), {'url': 'me?fields=id%2Cname', 'headers': {}})
+    assert_equal(herc.result(), {'url': 'herc', 'headers': {}})
+    assert_raises(GraphAPI.FacebookError, forbidden.result)
+    assert_equal(forbidden.exception().status_code, 400)
+
+
+@with_setup(mock, unmock)
+def test_autobatch_with_query_string():
+    graph = GraphAPI('<access token>', batch_window=0.01)
+
+    mock_request.side_effect = batch_side_effect(echo_url)
+
+    with graph.autobatch(window=1) as batcher:
+        posts = batcher.get('herc?fields=posts', limit=5)
+
+    assert_equal(posts.result(), {'url': 'herc?fields=posts&limit=5', 'headers': {}})
+    assert_equal(graph.get('herc?fields=posts', limit=5), {'url': 'herc?fields=posts&limit=5', 'headers': {}})
+
+
+@with_setup(mock, unmock)
+def test_autobatch_with_missing_responses():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value = MagicMock(content=json.dumps([None]), status_code=200)
+
+    with graph.autobatch(window=1) as batcher:
+        me = batcher.get('me')
+        herc = batcher.get('herc')
+
+    assert_raises(GraphAPI.FacebookError, me.result, 1)
+    assert_raises(GraphAPI.FacebookError, herc.result, 1)
+
+
+@with_setup(mock, unmock)
+def test_get_with_batch_window():
+    graph = GraphAPI('<access token>', batch_window=0.1)
+
+    mock_request.side_effect = batch_side_effect(echo_url)
+
+    results = {}
+
+    def get(path):
+        results[path] = graph.get(path)
+
+    threads = [threading.Thread(target=get, args=(str(i),)) for i in range(10)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal(results, dict((str(i), {'url': str(i), 'headers': {}}) for i in range(10)))
+
+
+@with_setup(mock, unmock)
+def test_get_with_batch_window_and_cache():
+    from facepy.cache import MemoryCache
+
+    graph = GraphAPI('<access token>', batch_window=0.01, cache=MemoryCache())
+
+    mock_request.side_effect = batch_side_effect(echo_url)
+
+    assert_equal(graph.get('me'), {'url': 'me', 'headers': {}})
+    assert_equal(graph.get('me'), {'url': 'me', 'headers': {}})
+
+    assert_equal(len(mock_request.call_args_list), 1)
+
+
+@with_setup(mock, unmock)
+def test_get_with_batch_window_retries():
+    graph = GraphAPI('<access token>', batch_window=0.01)
+
+    responses = [
+        {'code': 500, 'headers': [], 'body': '{"error": {"code": 2, "message": "Service temporarily unavailable"}}'},
+        {'code': 200, 'headers': [], 'body': '{"id": 1}'}
+    ]
+
+    def side_effect(*args, **kwargs):
+        return MagicMock(content=json.dumps([responses.pop(0)]), status_code=200)
+
+    mock_request.side_effect = side_effect
+
+    assert_equal(graph.get('me', retry=1), {'id': 1, 'headers': {}})
+    assert_equal(graph.stats['retries'], 1)
+
+
+def test_batch_window_with_etags():
+    assert_raises(ValueError, GraphAPI, '<access token>', batch_window=0.01, etags=True)
+
+
+@with_setup(mock, unmock)
+def test_get_with_throttle():
+    throttle = MagicMock()
+    graph = GraphAPI('<access token>', throttle=throttle, app_id='1234')
+
+    mock_request.return_value.content = json.dumps({'id': 1})
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {'X-App-Usage': '{"call_count": 10}'}
+
+    graph.get('me')
+
+    throttle.acquire.assert_called_with('<access token>', '1234')
+    throttle.update.assert_called_with('<access token>', {'X-App-Usage': '{"call_count": 10}'}, '1234')
+
+
+@with_setup(mock, unmock)
+def test_permanent_errors_are_not_retried():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({
+        'error': {
+            'message': 'Error validating access token',
+            'type': 'OAuthException',
+            'code': 190
+        }
+    })
+    mock_request.return_value.status_code = 400
+
+    assert_raises(GraphAPI.OAuthError, graph.get, 'me', retry=3)
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal((graph.stats['requests'], graph.stats['retries']), (1, 0))
+
+
+@with_setup(mock, unmock)
+def test_retry_statistics():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.status_code = 500
+    mock_request.return_value.content = ''
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', retry=2)
+    assert_equal((graph.stats['requests'], graph.stats['retries']), (3, 2))
+
+
+@with_setup(mock, unmock)
+def test_transfer_statistics():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = b'{"id": 1}'
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.raw.tell.return_value = 5
+
+    graph.get('me')
+    graph.get('me')
+
+    assert_equal(graph.stats['bytes_received'], 10)
+    assert_equal(graph.stats['bytes_decompressed'], 18)
+
+    # Responses whose size on the wire is unknown count as uncompressed.
+    mock_request.return_value.raw = None
+
+    graph.get('me')
+
+    assert_equal(graph.stats['bytes_received'], 19)
+    assert_equal(graph.stats['bytes_decompressed'], 27)
+
+
+def test_accept_encoding():
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    assert_equal(GraphAPI('<access token>').session.headers['Accept-Encoding'], ACCEPT_ENCODING)
+
+
+def test_connection_pool_options():
+    graph = GraphAPI('<access token>', pool_connections=2, pool_maxsize=64, pool_block=True, keep_alive=False)
+
+    adapter = graph.session.get_adapter('https://graph.facebook.com')
+
+    assert_equal(adapter._pool_connections, 2)
+    assert_equal(adapter._pool_maxsize, 64)
+    assert_equal(adapter._pool_block, True)
+    assert_equal(graph.session.headers['Connection'], 'close')
+
+
+@with_setup(mock, unmock)
+def test_shared_session():
+    session = MagicMock()
+    session.request.return_value = MagicMock(content='{"id": 1}', status_code=200)
+
+    GraphAPI('<access token>', session=session).get('me')
+    GraphAPI('<another access token>', session=session).get('me')
+
+    assert_equal(len(session.request.call_args_list), 2)
+    assert_equal(len(mock_request.call_args_list), 0)
@@ -0,0 +1,63 @@
+"""Tests for the ``retry`` module."""
+import time
+
+from nose.tools import assert_equal, assert_false, assert_true
+
+from facepy.exceptions import FacebookError, HTTPError, InternalFacebookError, OAuthError
+from facepy.retry import RetryPolicy
+
+
+def test_is_retryable():
+    policy = RetryPolicy()
+
+    assert_true(policy.is_retryable(HTTPError('Connection reset by peer')))
+    assert_true(policy.is_retryable(InternalFacebookError('Internal Facebook error occurred', 500)))
+    assert_true(policy.is_retryable(FacebookError('Application request limit reached', code=4)))
+    assert_true(policy.is_retryable(FacebookError('Service temporarily unavailable', code=2)))
+    assert_true(policy.is_retryable(FacebookError('Please retry', code=100, is_transient=True)))
+    assert_true(policy.is_retryable(FacebookError('User request limit reached', code=80001)))
+
+    assert_false(policy.is_retryable(FacebookError('Invalid parameter', code=100)))
+    assert_false(policy.is_retryable(OAuthError('Error validating access token', code=190)))
+
+
+def test_get_delay():
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+
+    assert_equal([policy.get_delay(attempt) for attempt in range(1, 6)], [1, 2, 4, 5, 5])
+
+    policy = RetryPolicy(backoff=1, jitter=True)
+
+    assert 0 <= policy.get_delay(3) <= 4
+
+
+def test_get_delay_honors_retry_after():
+    policy = RetryPolicy(backoff=1, jitter=False)
+
+    exception = InternalFacebookError('Internal Facebook error occurred', 503)
+    exception.headers = {'Retry-After': '7'}
+
+    assert_equal(policy.get_delay(1, exception), 7)
+
+
+def test_get_delay_limits_retry_after():
+    exception = InternalFacebookError('Internal Facebook error occurred', 503)
+    exception.headers = {'Retry-After': '86400'}
+
+    assert_equal(RetryPolicy(max_backoff=30).get_delay(1, exception), 30)
+
+    delay = RetryPolicy(max_backoff=30, deadline=10).get_delay(1, exception, time.time() - 5)
+
+    assert 4 <= delay <= 5
+
+
+def test_should_retry():
+    policy = RetryPolicy(retries=2, deadline=10)
+    exception = HTTPError('Connection reset by peer')
+
+    assert_true(policy.should_retry(1, exception, time.time()))
+    assert_true(policy.should_retry(2, exception, time.time()))
+    assert_false(policy.should_retry(3, exception, time.time()))
+
+    # The deadline would be exceeded.
+    assert_false(policy.should_retry(1, exception, time.time() - 5, delay=6))
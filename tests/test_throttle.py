@@ -0,0 +1,139 @@
+"""Tests for the ``throttle`` module."""
+import json
+
+from mock import patch
+from nose.tools import assert_equal
+
+from facepy.throttle import Throttle, _digest
+
+
+def test_usage():
+    throttle = Throttle()
+
+    throttle.update('<access token>', {
+        'X-App-Usage': json.dumps({'call_count': 10, 'total_time': 25, 'total_cputime': 5}),
+        'X-Page-Usage': json.dumps({'call_count': 30, 'total_time': 2, 'total_cputime': 2}),
+        'X-Business-Use-Case-Usage': json.dumps({
+            '1234': [
+                {'type': 'pages', 'call_count': 40, 'total_cputime': 1, 'total_time': 1, 'estimated_time_to_regain_access': 0}
+            ]
+        })
+    })
+
+    assert_equal(throttle.usage, {
+        ('app', _digest('<access token>')): 25,
+        ('token', _digest('<access token>')): 30,
+        ('business', '1234'): 40
+    })
+
+
+def test_usage_by_app_and_ad_account():
+    throttle = Throttle()
+
+    throttle.update('1234|<app secret>', {'X-App-Usage': json.dumps({'call_count': 10})})
+    throttle.update('<access token>', {'X-App-Usage': json.dumps({'call_count': 20})}, app_id='5678')
+    throttle.update('<access token>', {
+        'X-Page-Usage': json.dumps({'call_count': 30}),
+        'X-Ad-Account-Usage': json.dumps({'acc_id_util_pct': 40, 'reset_time_duration': 0})
+    })
+
+    assert_equal(throttle.usage, {
+        ('app', '1234'): 10,
+        ('app', '5678'): 20,
+        ('token', _digest('<access token>')): 30,
+        ('ad_account', _digest('<access token>')): 40
+    })
+
+
+def test_usage_is_bounded():
+    throttle = Throttle(rate=10, maxsize=2)
+
+    for token in ['<first access token>', '<second access token>', '<third access token>']:
+        throttle.acquire(token)
+        throttle.update(token, {
+            'X-Page-Usage': json.dumps({'call_count': 10}),
+            'X-Business-Use-Case-Usage': json.dumps({token: [{'call_count': 10, 'estimated_time_to_regain_access': 1}]})
+        })
+
+    assert_equal(throttle.usage, {
+        ('business', '<third access token>'): 10,
+        ('token', _digest('<third access token>')): 10
+    })
+    assert_equal(len(throttle._buckets), 2)
+    assert_equal(len(throttle._blocked_until), 2)
+    assert_equal(len(throttle._businesses), 2)
+
+def test_unexpected_usage_headers_are_ignored():
+    throttle = Throttle()
+
+    throttle.update('<access token>', {
+        'X-App-Usage': '{"call_count": ',
+        'X-Page-Usage': '[1, 2]',
+        'X-Ad-Account-Usage': json.dumps({'acc_id_util_pct': 'high'}),
+        'X-Business-Use-Case-Usage': json.dumps({'1234': {'call_count': 50}, '5678': [1, {'call_count': 60}]})
+    })
+    throttle.update('<access token>', {'X-Business-Use-Case-Usage': json.dumps([{'call_count': 70}])})
+
+    assert_equal(throttle.usage, {
+        ('ad_account', _digest('<access token>')): 0,
+        ('business', '5678'): 60
+    })
+
+
+@patch('facepy.throttle.time')
+def test_acquire_under_threshold(time):
+    time.time.return_value = 0
+
+    throttle = Throttle(threshold=75)
+    throttle.update('<access token>', {'X-App-Usage': json.dumps({'call_count': 50})})
+
+    for i in range(100):
+        throttle.acquire('<access token>')
+
+    assert_equal(time.sleep.called, False)
+
+
+@patch('facepy.throttle.time')
+def test_acquire_over_threshold(time):
+    clock = [0]
+    time.time.side_effect = lambda: clock[0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    time.sleep.side_effect = sleep
+
+    throttle = Throttle(threshold=50, throttled_rate=2)
+    throttle.update('<access token>', {'X-App-Usage': json.dumps({'call_count': 75})})
+
+    for i in range(11):
+        throttle.acquire('<access token>')
+
+    # Half of the headroom is left, so the rate is halved to one request per second.
+    assert_equal(clock[0], 10)
+
+
+@patch('facepy.throttle.time')
+def test_acquire_while_blocked(time):
+    clock = [0]
+    time.time.side_effect = lambda: clock[0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    time.sleep.side_effect = sleep
+
+    throttle = Throttle()
+    throttle.update('<access token>', {
+        'X-Business-Use-Case-Usage': json.dumps({
+            '1234': [
+                {'type': 'pages', 'call_count': 100, 'estimated_time_to_regain_access': 5}
+            ]
+        })
+    })
+
+    throttle.acquire('<another access token>')
+    assert_equal(clock[0], 0)
+
+    throttle.acquire('<access token>')
+    assert clock[0] >= 300
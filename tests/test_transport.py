@@ -0,0 +1,205 @@
+"""Tests for the ``transport`` module."""
+import functools
+
+import urllib3
+
+from six.moves.urllib.parse import parse_qs, urlparse
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from nose.plugins.skip import SkipTest
+from nose.tools import assert_equal, assert_raises
+from mock import MagicMock
+
+from facepy import GraphAPI
+from facepy.transport import HTTP2Transport, RequestsTransport, Transport, TransportResponse, Urllib3Transport
+
+
+class FakeTransport(Transport):
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+def requires_httpx(test):
+    """
+    Skip the given test if httpx isn't installed, which it only is on Python 3.6 and later.
+    """
+    @functools.wraps(test)
+    def wrapper():
+        if httpx is None:
+            raise SkipTest('HTTP2Transport requires httpx.')
+
+        return test()
+
+    return wrapper
+
+
+def test_transport_is_shared():
+    transport = RequestsTransport(pool_maxsize=64)
+    transport.session = MagicMock()
+    transport.session.request.return_value = MagicMock(content='{"id": 1}', status_code=200)
+
+    GraphAPI('<access token>', transport=transport).get('me')
+    GraphAPI('<another access token>', transport=transport).get('me')
+
+    assert_equal(
+        [call[1]['params']['access_token'] for call in transport.session.request.call_args_list],
+        ['<access token>', '<another access token>']
+    )
+
+
+def test_cookies_are_not_kept():
+    transport = RequestsTransport()
+
+    assert_equal(transport.session.cookies.get_policy().allowed_domains(), ())
+
+
+@requires_httpx
+def test_http2_transport():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+
+        if 'after' in request.url.params:
+            return httpx.Response(200, json={'data': [2]})
+
+        return httpx.Response(200, json={
+            'data': [1],
+            'paging': {'next': 'https://graph.facebook.com/me/posts?after=1'}
+        })
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    graph = GraphAPI('<access token>', transport=HTTP2Transport(client=client), timeout=5)
+
+    pages = list(graph.get('me/posts', page=True, limit=1))
+
+    assert_equal([page['data'] for page in pages], [[1], [2]])
+    assert_equal(
+        [str(request.url) for request in requests],
+        [
+            'https://graph.facebook.com/me/posts?limit=1&access_token=%3Caccess+token%3E',
+            'https://graph.facebook.com/me/posts?after=1&limit=1&access_token=%3Caccess+token%3E'
+        ]
+    )
+
+
+@requires_httpx
+def test_http2_transport_errors():
+    client = MagicMock()
+    client.request.side_effect = httpx.ConnectError('Connection refused')
+
+    graph = GraphAPI('<access token>', transport=HTTP2Transport(client=client))
+
+    assert_raises(GraphAPI.HTTPError, graph.get, 'me', retry=0)
+
+
+@requires_httpx
+def test_graph_api_with_http2():
+    graph = GraphAPI('<access token>', http2=True)
+
+    assert isinstance(graph.transport, HTTP2Transport)
+    assert_equal(graph.session, None)
+
+
+def test_custom_transport():
+    transport = FakeTransport(
+        TransportResponse(200, {}, b'{"id": 1}'),
+        TransportResponse(200, {}, b'{"id": 2}')
+    )
+    graph = GraphAPI('<access token>', transport=transport, timeout=5)
+
+    assert_equal(graph.get('me', fields='id'), {'id': 1, 'headers': {}})
+    assert_equal(graph.post('me/feed', message='Hi'), {'id': 2, 'headers': {}})
+
+    assert_equal(transport.requests, [
+        ('GET', 'https://graph.facebook.com/me', {
+            'params': {'fields': 'id', 'access_token': '<access token>'},
+            'headers': None,
+            'timeout': 5,
+            'verify': True
+        }),
+        ('POST', 'https://graph.facebook.com/me/feed', {
+            'data': {'message': 'Hi', 'access_token': '<access token>'},
+            'files': {},
+            'timeout': 5,
+            'verify': True
+        })
+    ])
+
+
+def test_custom_transport_errors():
+    transport = FakeTransport(TransportResponse(500, {'Retry-After': '1'}, b''))
+    graph = GraphAPI('<access token>', transport=transport)
+
+    try:
+        graph.get('me', retry=0)
+    except GraphAPI.FacebookError as exception:
+        assert_equal(exception.status_code, 500)
+        assert_equal(exception.headers, {'Retry-After': '1'})
+    else:
+        raise AssertionError('FacebookError was not raised')
+
+
+def test_urllib3_transport():
+    pool_manager = MagicMock()
+    pool_manager.urlopen.return_value = MagicMock(data=b'{"id": 1}', status=200, headers={})
+
+    graph = GraphAPI('<access token>', transport=Urllib3Transport(pool_manager=pool_manager), timeout=5)
+
+    assert_equal(graph.get('me', fields='id'), {'id': 1, 'headers': {}})
+
+    args, kwargs = pool_manager.urlopen.call_args
+    url = urlparse(args[1])
+    assert_equal((args[0], url.netloc, url.path), ('GET', 'graph.facebook.com', '/me'))
+    assert_equal(parse_qs(url.query), {'fields': ['id'], 'access_token': ['<access token>']})
+    assert_equal(kwargs['body'], None)
+    assert_equal(kwargs['redirect'], True)
+    assert_equal(kwargs['timeout'].total, 5)
+
+    graph.post('me/feed', message='Hi')
+
+    args, kwargs = pool_manager.urlopen.call_args
+    assert_equal(args, ('POST', 'https://graph.facebook.com/me/feed'))
+    assert_equal(parse_qs(kwargs['body']), {'message': ['Hi'], 'access_token': ['<access token>']})
+    assert_equal(kwargs['headers']['Content-Type'], 'application/x-www-form-urlencoded')
+    assert_equal(kwargs['redirect'], False)
+
+
+def test_urllib3_transport_errors():
+    pool_manager = MagicMock()
+    pool_manager.urlopen.side_effect = urllib3.exceptions.MaxRetryError(None, '/', 'Connection refused')
+
+    graph = GraphAPI('<access token>', transport=Urllib3Transport(pool_manager=pool_manager))
+
+    assert_raises(GraphAPI.HTTPError, graph.get, 'me', retry=0)
+
+
+def test_custom_transport_stream():
+    transport = FakeTransport(TransportResponse(200, {}, b'{"data": [{"id": 1}, {"id": 2}], "paging": {}}'))
+    graph = GraphAPI('<access token>', transport=transport)
+
+    assert_equal(list(graph.iter_items('me/posts', stream=True)), [{'id': 1}, {'id': 2}])
+
+
+def test_urllib3_transport_stream():
+    response = MagicMock(status=200, headers={})
+    response.stream.return_value = iter([b'{"data": [{"id": 1}', b', {"id": 2}]}'])
+
+    pool_manager = MagicMock()
+    pool_manager.urlopen.return_value = response
+
+    graph = GraphAPI('<access token>', transport=Urllib3Transport(pool_manager=pool_manager))
+
+    assert_equal(list(graph.iter_items('me/posts', stream=True)), [{'id': 1}, {'id': 2}])
+    assert_equal(pool_manager.urlopen.call_args[1]['preload_content'], False)
+    assert response.release_conn.called